@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""Compares the streaming status extractor with the PyQuery full-DOM parse of :func:`fivem.down_detector`
+on the recorded page fixtures. The page is fed in chunks of 8 KiB, like it is read from the network.
+
+Run it from the project directory with ``python3 benchmarks/bench_down_detector.py``
+"""
+import glob
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from pyquery import PyQuery  # noqa: E402
+
+from fivem import StatusExtractor  # noqa: E402
+
+CHUNK_SIZE = 8192
+ROUNDS = 50
+
+
+def chunked(page: bytes):
+    for i in range(0, len(page), CHUNK_SIZE):
+        yield page[i:i + CHUNK_SIZE]
+
+
+def parse_pyquery(page: bytes):
+    """The previous path: download everything, then build the whole DOM. Returns the status and the bytes read"""
+    text = b"".join(chunked(page)).decode("utf-8")
+    return PyQuery(text)("body div#company div.h2.entry-title").html(), len(page)
+
+
+def parse_streaming(page: bytes):
+    """The streaming path: stop reading as soon as the status element is complete"""
+    extractor = StatusExtractor()
+    read = 0
+    for chunk in chunked(page):
+        read += len(chunk)
+        if extractor.feed_bytes(chunk):
+            break
+    return extractor.status, read
+
+
+def measure(func, page: bytes):
+    seconds = min(timeit.repeat(lambda: func(page), number=1, repeat=ROUNDS))
+    tracemalloc.start()
+    status, read = func(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return status, seconds, peak, read
+
+
+def main():
+    fixtures = sorted(glob.glob(os.path.join(os.path.dirname(os.path.realpath(__file__)), "fixtures", "allestoerungen*.html")))
+    for fixture in fixtures:
+        with open(fixture, "rb") as f:
+            page = f.read()
+        print(os.path.basename(fixture) + " (" + str(len(page)) + " bytes)")
+        results = {}
+        for name, func in (("pyquery", parse_pyquery), ("streaming", parse_streaming)):
+            status, seconds, peak, read = measure(func, page)
+            results[name] = status
+            print("  {:<10} {:8.3f} ms  peak {:8.1f} KiB  read {:8d} bytes".format(name, seconds * 1000, peak / 1024, read))
+        if (results["pyquery"] or "").strip() != (results["streaming"] or "").strip():
+            print("  MISMATCH: " + repr(results["pyquery"]) + " != " + repr(results["streaming"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""Compares how long a logging call blocks the calling thread with the previous ``logging.basicConfig`` file handler
+and with :func:`dashboard.setup_logging`, during an error storm of warnings with tracebacks from a few lines of code.
+
+Run it from the project directory with ``python3 benchmarks/bench_logging.py``
+"""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from dashboard import setup_logging  # noqa: E402
+
+RECORDS = 20000
+
+
+def storm() -> list:
+    """Logs the records like failing status updates would and returns the duration of every call"""
+    durations = []
+    for i in range(RECORDS):
+        try:
+            raise ConnectionError("Cannot connect to host discord.com:443")
+        except ConnectionError as e:
+            started = perf_counter()
+            if i % 2:
+                logging.warning("skipped status update server" + str(i % 10), exc_info=e)
+            else:
+                logging.warning("failed to fetch down detector status", exc_info=e)
+            durations.append(perf_counter() - started)
+    return durations
+
+
+def report(name: str, durations: list, path: str):
+    durations.sort()
+    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    print("{:<13} p50 {:7.1f} us  p99 {:7.1f} us  total {:7.1f} ms  written {:6d} KB".format(
+        name, durations[len(durations) // 2] * 1e6, durations[int(len(durations) * 0.99)] * 1e6,
+        sum(durations) * 1000, size // 1024))
+
+
+def main():
+    root = logging.getLogger()
+    directory = tempfile.mkdtemp(prefix="dashboard-logging-")
+    try:
+        path = os.path.join(directory, "basic")
+        os.mkdir(path)
+        logging.basicConfig(filename=os.path.join(path, "latest.log"), filemode="w", level=logging.INFO,
+                            format="%(asctime)s:%(levelname)s:%(message)s")
+        report("basicConfig", storm(), path)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+
+        for name, burst in (("queued", 0), ("rate limited", 5)):
+            path = os.path.join(directory, name.replace(" ", "-"))
+            os.mkdir(path)
+            listener = setup_logging(os.path.join(path, "latest.log"), burst=burst)
+            durations = storm()
+            listener.stop()
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            report(name, durations, path)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
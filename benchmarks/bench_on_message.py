@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""Compares the throughput of the previous on_message chain with the :class:`dashboard.CommandRouter`
+and :class:`dashboard.PhraseMatcher` by replaying the recorded message stream ``fixtures/messages.jsonl``.
+The handlers do nothing, so only the dispatching is measured.
+
+Run it from the project directory with ``python3 benchmarks/bench_on_message.py``
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import discord  # noqa: E402
+
+from dashboard import CommandRouter, PhraseMatcher  # noqa: E402
+
+FIVEM_BOT_ID = 792179217921792164
+RESTART_MESSAGE = "wird neu gestartet"
+RESTART_WARN_MSG = "wird in 15 Minuten neu gestartet"
+ROUNDS = 20
+
+
+class Author:
+    def __init__(self, author_id: int, bot: bool):
+        self.id = author_id
+        self.bot = bot
+        self.guild_permissions = discord.Permissions(administrator=author_id % 50 == 0)
+
+
+class Message:
+    def __init__(self, author: Author, content: str):
+        self.author = author
+        self.content = content
+
+
+def load_messages() -> list:
+    path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "fixtures", "messages.jsonl")
+    authors = {}
+    messages = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            data = json.loads(line)
+            author = authors.setdefault(data["author_id"], Author(data["author_id"], data["bot"]))
+            messages.append(Message(author, data["content"]))
+    return messages
+
+
+def run(coroutine):
+    """Runs a coroutine which never suspends, without the overhead of an event loop"""
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("the coroutine suspended")
+
+
+async def handler(*args):
+    pass
+
+
+async def previous_on_message(message):
+    """The dispatching of the previous Client.on_message"""
+    lower_message = message.content.lower()
+    if message.author.bot and message.author.id == FIVEM_BOT_ID:
+        if RESTART_MESSAGE.lower() in lower_message:
+            await handler()
+        elif RESTART_WARN_MSG.lower() in lower_message:
+            await handler()
+    elif lower_message.startswith("!toggleuptimevisibility") and message.author.guild_permissions.administrator:
+        await handler()
+    elif lower_message.startswith("!fivem"):
+        await handler()
+    elif lower_message.startswith("!stats"):
+        await handler(lower_message.split()[1:])
+    elif lower_message.startswith("!togglecfxstatus") and message.author.guild_permissions.administrator:
+        await handler()
+    elif lower_message.startswith("!toggledowndetectorstatus") and message.author.guild_permissions.administrator:
+        await handler()
+
+
+def create_router() -> CommandRouter:
+    matcher = PhraseMatcher([
+        (RESTART_MESSAGE, 0),
+        ("startet jetzt neu", 0),
+        (RESTART_WARN_MSG, 15),
+        ("wird in 30 Minuten neu gestartet", 30),
+        ("wird in 5 Minuten neu gestartet", 5),
+    ])
+
+    async def on_fivem_bot_message(message):
+        if message.author.bot and matcher.search(message.content) is not None:
+            await handler()
+
+    router = CommandRouter()
+    router.watch(FIVEM_BOT_ID, on_fivem_bot_message)
+    for name in ("toggleuptimevisibility", "togglecfxstatus", "toggledowndetectorstatus"):
+        router.command(name, handler, admin_only=True)
+    router.command("fivem", handler)
+    router.command("stats", handler)
+    return router
+
+
+def main():
+    messages = load_messages()
+    router = create_router()
+
+    def replay_previous():
+        for message in messages:
+            run(previous_on_message(message))
+
+    def replay_router():
+        for message in messages:
+            run(router.dispatch(message))
+
+    print(str(len(messages)) + " messages")
+    for name, replay in (("previous", replay_previous), ("router", replay_router)):
+        seconds = min(timeit.repeat(replay, number=1, repeat=ROUNDS))
+        print("  {:<9} {:8.3f} ms  {:10.0f} messages/s".format(name, seconds * 1000, len(messages) / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""Compares the previous full parse of the players.json with the streaming :class:`fivem.ArrayCounter` and with
+reading the player amount from the dynamic.json, on generated fixtures of 2048 players.
+The payload is fed in chunks of 64 KiB, like it is read from the network.
+
+Run it from the project directory with ``python3 benchmarks/bench_players_json.py``
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from fake_fivem import FakeFiveMServer  # noqa: E402
+from fivem import ArrayCounter  # noqa: E402
+
+PLAYERS = 2048
+CHUNK_SIZE = 65536
+ROUNDS = 50
+
+
+def fixtures() -> dict:
+    """The players.json of a fake server, once with plain names and once with every 8th name full of quotes,
+    backslashes, brackets and commas, which is the slow path of the counter"""
+    players = FakeFiveMServer(players=PLAYERS).player_list()
+    plain = json.dumps(players).encode("utf-8")
+    for player in players[::8]:
+        player["name"] = "[Team \"Ünter\\Welt\"], {" + player["name"] + "}"
+    escaped = json.dumps(players).encode("utf-8")
+    dynamic = json.dumps({"clients": PLAYERS, "gametype": "Freeroam", "hostname": "Fake FiveM Server",
+                          "mapname": "fivem-map-skater", "sv_maxclients": "2048"}).encode("utf-8")
+    return {"plain names": plain, "escaped names": escaped, "dynamic.json": dynamic}
+
+
+def chunked(payload: bytes):
+    for i in range(0, len(payload), CHUNK_SIZE):
+        yield payload[i:i + CHUNK_SIZE]
+
+
+def count_parsed(payload: bytes) -> int:
+    """The previous path of ``r.json()``: read everything, decode it and build every player, only to count them"""
+    return len(json.loads(b"".join(chunked(payload)).decode("utf-8")))
+
+
+def count_streaming(payload: bytes) -> int:
+    """The count mode: count the players while the chunks arrive, without building them"""
+    counter = ArrayCounter()
+    for chunk in chunked(payload):
+        if counter.feed_bytes(chunk):
+            break
+    return counter.count
+
+
+def count_dynamic(payload: bytes) -> int:
+    """The dynamic mode: parse the small dynamic.json"""
+    return int(json.loads(b"".join(chunked(payload)).decode("utf-8"))["clients"])
+
+
+def measure(func, payload: bytes):
+    seconds = min(timeit.repeat(lambda: func(payload), number=1, repeat=ROUNDS))
+    tracemalloc.start()
+    count = func(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, seconds, peak
+
+
+def main():
+    payloads = fixtures()
+    for name, func, fixture in (
+            ("parsed", count_parsed, "plain names"),
+            ("streaming", count_streaming, "plain names"),
+            ("parsed", count_parsed, "escaped names"),
+            ("streaming", count_streaming, "escaped names"),
+            ("dynamic", count_dynamic, "dynamic.json"),
+    ):
+        payload = payloads[fixture]
+        count, seconds, peak = measure(func, payload)
+        print("{:<10} {:<14} {:7d} bytes  {:8.3f} ms  peak {:8.1f} KiB  {} players".format(
+            name, fixture, len(payload), seconds * 1000, peak / 1024, count))
+        if count != PLAYERS:
+            print("  MISMATCH: " + str(count) + " != " + str(PLAYERS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""Checks that the fivem status which the probe worker fetched does not expire in the cache of the bot
+while it stays unchanged. The worker and the bot each get their own :class:`fivem.UpstreamCache` with short
+lifetimes, the worker revalidates the status every round and its messages are applied by the bot.
+
+Run it from the project directory with ``python3 benchmarks/check_upstream_relay.py``
+"""
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+os.environ["DASHBOARD_LOG_FILE"] = os.path.join(tempfile.mkdtemp(), "latest.log")
+
+import bot  # noqa: E402
+import fivem  # noqa: E402
+import worker  # noqa: E402
+
+STATUS = "All Systems Operational"
+TTL = 0.1
+STALE_TTL = 0.2
+DURATION = 1.0
+ROUND = 0.05
+
+
+async def fetch_unchanged(session, cache: fivem.UpstreamCache, timeout: float):
+    """Like the fetch functions of the fivem package, when the upstream answers with a 304 Not Modified"""
+    try:
+        return cache.revalidated("cfx_status")
+    except KeyError:
+        return cache.store("cfx_status", STATUS)
+
+
+class Bot(bot.StatusDashboard):
+    """Applies the worker messages like the bot, but counts the publishes instead of editing messages"""
+
+    def __init__(self):
+        self.publishes = 0
+
+    async def edit_status_message(self, monitored, target, embed) -> bool:
+        return False
+
+    def upstream_updated(self, key: str):
+        self.publishes += 1
+
+
+async def main() -> bool:
+    worker_cache = fivem.UpstreamCache(ttl=TTL, stale_ttl=STALE_TTL)
+    bot_cache = fivem.UpstreamCache(ttl=TTL, stale_ttl=STALE_TTL)
+    bot.UPSTREAM_SOURCES = {"cfx_status": (fetch_unchanged, contextlib.nullcontext, True)}
+    messages = []
+    probe_worker = worker.ProbeWorker(asyncio.get_running_loop())
+    probe_worker.send = messages.append
+    receiver = Bot()
+    missing = 0
+    for _ in range(int(DURATION / ROUND)):
+        bot.upstream_cache = worker_cache
+        await probe_worker.fetch_upstream("cfx_status", 1)
+        bot.upstream_cache = bot_cache
+        for message in messages:
+            receiver.apply_worker_message(message)
+        messages.clear()
+        if bot_cache.get("cfx_status") != STATUS:
+            missing += 1
+        await asyncio.sleep(ROUND)
+    print("rounds without the status on the bot: {}, publishes: {}".format(missing, receiver.publishes))
+    if missing or receiver.publishes != 1:
+        print("  MISMATCH: the status expired or was published again although it did not change")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,144 @@
+"""A stand-in for the Discord REST API as seen by the bot: channels and messages whose requests
+take a configurable time and which are rate limited like a Discord channel."""
+import asyncio
+import itertools
+from collections import deque
+from time import monotonic, time
+from typing import Deque, Dict, List, Optional, Tuple
+
+import discord
+
+_ids = itertools.count(1000)
+
+
+class FakeResponse:
+    """Mimics the aiohttp response discord.py passes to :class:`discord.HTTPException`"""
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str] = None):
+        self.status = status
+        self.reason = reason
+        self.headers = headers or {}
+
+
+class FakeUser:
+    def __init__(self, user_id: int, bot: bool = False, administrator: bool = False, name: str = "user"):
+        self.id = user_id
+        self.bot = bot
+        self.name = name
+        self.guild_permissions = discord.Permissions(administrator=administrator)
+
+
+class FakeDiscord:
+    """The shared state of the fake API: latency, rate limits and the recorded requests"""
+
+    def __init__(self, latency: float = 0.05, rate_limit: int = 5, rate_limit_window: float = 5):
+        self.latency = latency
+        """The duration of every request in seconds"""
+        self.rate_limit = rate_limit
+        """How many requests per channel are allowed within the window"""
+        self.rate_limit_window = rate_limit_window
+        self.bot_user = FakeUser(1, bot=True, name="dashboard")
+        """The user of the bot itself"""
+        self.channels: Dict[int, "FakeChannel"] = {}
+        self.requests: List[Tuple[float, str, int]] = []
+        """Every request as (timestamp, method, channel id)"""
+        self.edits: List[Tuple[float, int, discord.Embed]] = []
+        """Every successful edit or sent embed as (timestamp, channel id, embed)"""
+        self.rate_limited: int = 0
+        """How many requests were answered with a 429"""
+
+    def channel(self, channel_id: int) -> "FakeChannel":
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(self, channel_id)
+        return self.channels[channel_id]
+
+    async def request(self, method: str, channel: "FakeChannel"):
+        """Simulates one REST request on the channel bucket"""
+        now = monotonic()
+        bucket = channel.bucket
+        while bucket and bucket[0] <= now - self.rate_limit_window:
+            bucket.popleft()
+        self.requests.append((time(), method, channel.id))
+        if len(bucket) >= self.rate_limit:
+            self.rate_limited += 1
+            retry_after = bucket[0] + self.rate_limit_window - now
+            raise discord.HTTPException(
+                FakeResponse(429, "Too Many Requests", {"Retry-After": str(retry_after)}),
+                {"message": "You are being rate limited.", "retry_after": retry_after, "code": 0},
+            )
+        bucket.append(now)
+        await asyncio.sleep(self.latency)
+
+
+class FakeMessage:
+    def __init__(self, api: FakeDiscord, channel: "FakeChannel", author: FakeUser, content: str = "",
+                 embed: Optional[discord.Embed] = None):
+        self.id = next(_ids)
+        self._api = api
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.embeds = [embed] if embed is not None else []
+        self.deleted = False
+
+    async def edit(self, content=None, embed=None, suppress=False):
+        if self.deleted:
+            raise discord.NotFound(FakeResponse(404, "Not Found"), {"message": "Unknown Message", "code": 10008})
+        await self._api.request("edit", self.channel)
+        self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+            self._api.edits.append((time(), self.channel.id, embed))
+        return self
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeChannel:
+    def __init__(self, api: FakeDiscord, channel_id: int):
+        self.id = channel_id
+        self._api = api
+        self.messages: List[FakeMessage] = []
+        self.bucket: Deque[float] = deque()
+        """The monotonic times of the requests within the rate limit window"""
+
+    async def send(self, content=None, embed=None, **kwargs) -> FakeMessage:
+        await self._api.request("send", self)
+        message = FakeMessage(self._api, self, self._api.bot_user, content or "", embed)
+        self.messages.append(message)
+        if embed is not None:
+            self._api.edits.append((time(), self.id, embed))
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        await self._api.request("fetch", self)
+        for message in self.messages:
+            if message.id == message_id and not message.deleted:
+                return message
+        raise discord.NotFound(FakeResponse(404, "Not Found"), {"message": "Unknown Message", "code": 10008})
+
+    async def history(self, limit: int = 100):
+        await self._api.request("history", self)
+        for message in list(reversed(self.messages))[:limit]:
+            if not message.deleted:
+                yield message
+
+    async def purge(self, bulk: bool = True, check=None, limit: int = 100) -> List[FakeMessage]:
+        await self._api.request("purge", self)
+        deleted = [m for m in self.messages[-limit:] if not m.deleted and (check is None or check(m))]
+        for message in deleted:
+            message.deleted = True
+        return deleted
+
+    def typing(self):
+        return _Typing()
+
+    def fake_message(self, author: FakeUser, content: str) -> FakeMessage:
+        """Creates a message like it is received over the gateway, without a request"""
+        return FakeMessage(self._api, self, author, content)
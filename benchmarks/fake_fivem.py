@@ -0,0 +1,147 @@
+"""A local stand-in for a FiveM server, serving ``players.json``, ``info.json`` and ``dynamic.json``
+and answering the ``getinfo`` query over UDP, with configurable latency, timeouts, player counts and flapping."""
+import asyncio
+import random
+from time import time
+from typing import List, Tuple
+
+from aiohttp import web
+
+
+class FakeFiveMServer:
+    """A fake FiveM server on localhost"""
+
+    def __init__(self, players: int = 32, max_players: int = 128, latency: float = 0.02, jitter: float = 0.01,
+                 timeout_rate: float = 0.0, timeout_delay: float = 10, flap_period: float = 0, port: int = 0):
+        """
+        :param players: The amount of players in the players.json
+        :param max_players: The sv_maxclients in the info.json
+        :param latency: The delay of every response in seconds
+        :param jitter: The maximum random extra delay of every response in seconds
+        :param timeout_rate: The fraction of requests which are answered only after ``timeout_delay``
+        :param timeout_delay: The delay of the timed out requests in seconds
+        :param flap_period: Toggle between online and offline every this many seconds. 0 to stay online
+        :param port: The port to listen on. 0 for a random free port
+        """
+        self.players = players
+        self.max_players = max_players
+        self.latency = latency
+        self.jitter = jitter
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.flap_period = flap_period
+        self.port = port
+        self.requests: int = 0
+        """The amount of answered requests"""
+        self.udp_requests: int = 0
+        """The amount of answered getinfo queries"""
+        self.transitions: List[Tuple[float, bool]] = []
+        """The timestamps when the server went online (True) or offline (False)"""
+        self._started_at: float = 0
+        self._runner: web.AppRunner = None
+        self._watcher: asyncio.Task = None
+        self._transport: asyncio.DatagramTransport = None
+
+    @property
+    def address(self) -> str:
+        """The IP with port, like it is configured for the bot"""
+        return "127.0.0.1:" + str(self.port)
+
+    def is_online(self) -> bool:
+        """Whether the server is online at the moment, depending on the flapping"""
+        if not self.flap_period:
+            return True
+        return int((time() - self._started_at) / self.flap_period) % 2 == 0
+
+    def player_list(self) -> list:
+        return [{
+            "endpoint": "127.0.0.1",
+            "id": i + 1,
+            "identifiers": [
+                "license:%040x" % (i + 1),
+                "discord:%018d" % (100000000000000000 + i),
+                "steam:%015x" % (0x110000100000000 + i),
+            ],
+            "name": "Player " + str(i + 1),
+            "ping": 30 + i % 70,
+        } for i in range(self.players)]
+
+    async def _delay(self):
+        if self.timeout_rate and random.random() < self.timeout_rate:
+            await asyncio.sleep(self.timeout_delay)
+        else:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        await self._delay()
+        if not self.is_online():
+            raise web.HTTPServiceUnavailable()
+        self.requests += 1
+        name = request.match_info["name"]
+        if name == "players.json":
+            return web.json_response(self.player_list())
+        elif name == "dynamic.json":
+            return web.json_response({
+                "clients": self.players,
+                "gametype": "Freeroam",
+                "hostname": "Fake FiveM Server",
+                "mapname": "fivem-map-skater",
+                "sv_maxclients": str(self.max_players),
+            })
+        elif name == "info.json":
+            return web.json_response({
+                "enhancedHostSupport": True,
+                "resources": ["sessionmanager", "mapmanager", "chat"],
+                "server": "FXServer-master SERVER v1.0.0.5848 linux",
+                "vars": {"sv_maxClients": str(self.max_players), "sv_projectName": "Fake"},
+                "version": 1,
+            })
+        raise web.HTTPNotFound()
+
+    async def _answer_info(self, challenge: str, addr):
+        await self._delay()
+        if not self.is_online() or self._transport is None or self._transport.is_closing():
+            return
+        self.udp_requests += 1
+        payload = "\\sv_maxclients\\{}\\clients\\{}\\challenge\\{}\\gamename\\CitizenFX\\protocol\\4" \
+                  "\\hostname\\Fake FiveM Server\\gametype\\Freeroam\\mapname\\fivem-map-skater\\iv\\0".format(
+                      self.max_players, self.players, challenge)
+        self._transport.sendto(b"\xff\xff\xff\xffinfoResponse\n" + payload.encode("utf-8"), addr)
+
+    async def _watch_flapping(self):
+        online = True
+        self.transitions.append((time(), online))
+        while True:
+            await asyncio.sleep(0.05)
+            if self.is_online() != online:
+                online = not online
+                self.transitions.append((time(), online))
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{name}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        server = self
+
+        class InfoProtocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                if data.startswith(b"\xff\xff\xff\xffgetinfo"):
+                    challenge = data[len(b"\xff\xff\xff\xffgetinfo"):].strip().decode("ascii", "replace")
+                    asyncio.ensure_future(server._answer_info(challenge, addr))
+
+        self._transport, _ = await asyncio.get_event_loop().create_datagram_endpoint(
+            InfoProtocol, local_addr=("127.0.0.1", self.port))
+        self._started_at = time()
+        self._watcher = asyncio.ensure_future(self._watch_flapping())
+
+    async def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+        if self._transport is not None:
+            self._transport.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,222 @@
+#!/usr/bin/python3
+"""Runs the bot against local fake FiveM servers and a fake Discord API and reports
+probe latency, event loop lag, edits per minute and the delay until a state change is shown.
+
+Run it from the project directory, e.g.
+``python3 benchmarks/harness.py --servers 20 --duration 60 --flap-period 15``
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+from time import monotonic, perf_counter, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+import discord  # noqa: E402
+
+from fake_discord import FakeDiscord, FakeUser  # noqa: E402
+from fake_fivem import FakeFiveMServer  # noqa: E402
+
+ONLINE_COLOUR = 0x74EE15
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def write_config(directory: str, servers: list, args) -> str:
+    """Writes a bot config for the fake servers and returns its path"""
+    lines = [
+        "[Settings]",
+        "token=unused",
+        "status-update-interval=" + str(args.interval),
+        "status-update-min-interval=" + str(args.min_interval or args.interval),
+        "status-update-max-interval=" + str(args.max_interval or args.interval),
+        "status-message=FiveM",
+        "fivem-server-ip=" + servers[0].address,
+        "status-channel-id=10000",
+        "max-players=128",
+        "max-concurrent-probes=" + str(args.concurrency),
+        "history-capacity=4096",
+        "data-directory=" + directory,
+        "probe-worker=" + ("yes" if args.worker else "no"),
+        "[Restart-Detection]",
+        "fivem-status-bot-id=42",
+        "restart-detection-message=wird neu gestartet",
+        "restart-warn-message=wird in 15 Minuten neu gestartet",
+        "restart-warn-delay=15",
+        "[Status-Message]",
+        "fivem-domain=localhost",
+    ]
+    for i, server in enumerate(servers):
+        lines += [
+            "[Server:s" + str(i) + "]",
+            "fivem-server-ip=" + server.address,
+            "fivem-domain=" + server.address,
+            "max-players=128",
+            "probe=" + args.probe,
+            "status-channel-id=" + str(10000 + i),
+            "mirror-channel-ids=" + ",".join(str(20000 + i * 100 + j) for j in range(args.mirrors)),
+        ]
+    path = os.path.join(directory, "config.ini")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+async def measure_loop_lag(samples: list, interval: float = 0.01):
+    """Records how much later than requested the event loop wakes up"""
+    while True:
+        started = monotonic()
+        await asyncio.sleep(interval)
+        samples.append(monotonic() - started - interval)
+
+
+async def handle_message(client, message, durations: list):
+    """Runs on_message like the discord.py dispatcher, which runs every event in its own task"""
+    started = perf_counter()
+    try:
+        await client.on_message(message)
+    except discord.HTTPException:
+        pass  # e.g. a rate limited command answer
+    durations.append(perf_counter() - started)
+
+
+async def replay_messages(client, api: FakeDiscord, rate: float, durations: list, restart_bot_id: int):
+    """Sends a stream of chat messages, commands and FiveM bot messages to on_message"""
+    channel = api.channel(99)
+    users = [FakeUser(100 + i, administrator=i == 0) for i in range(50)]
+    fivem_bot = FakeUser(restart_bot_id, bot=True)
+    texts = ["hi", "wann ist der server wieder online?", "lol", "gg", "hat jemand lust auf eine runde?",
+             "!fivem", "!stats 1h", "ich bin gleich wieder da", "der server laggt heute extrem"]
+    while True:
+        await asyncio.sleep(random.expovariate(rate))
+        if random.random() < 0.01:
+            message = channel.fake_message(fivem_bot, "Der Server wird in 15 Minuten neu gestartet")
+        else:
+            message = channel.fake_message(random.choice(users), random.choice(texts))
+        asyncio.ensure_future(handle_message(client, message, durations))
+
+
+def detection_delays(fake_servers: list, api: FakeDiscord) -> list:
+    """The seconds between each state change of a fake server and the first edit showing it"""
+    delays = []
+    for i, server in enumerate(fake_servers):
+        edits = [(t, embed.colour.value == ONLINE_COLOUR) for t, channel_id, embed in api.edits
+                 if channel_id == 10000 + i]
+        for changed_at, online in server.transitions[1:]:
+            for edited_at, shows_online in edits:
+                if edited_at >= changed_at and shows_online == online:
+                    delays.append(edited_at - changed_at)
+                    break
+    return delays
+
+
+async def run(args):
+    fake_servers = [
+        FakeFiveMServer(players=args.players, latency=args.latency, timeout_rate=args.timeout_rate,
+                        flap_period=args.flap_period)
+        for _ in range(args.servers)
+    ]
+    for server in fake_servers:
+        await server.start()
+    directory = tempfile.mkdtemp(prefix="dashboard-bench-")
+    os.environ["DASHBOARD_CONFIG"] = write_config(directory, fake_servers, args)
+    import bot
+
+    api = FakeDiscord(latency=args.discord_latency)
+
+    class BenchClient(bot.Client):
+        @property
+        def user(self):
+            return api.bot_user
+
+        def get_channel(self, channel_id):
+            return api.channel(channel_id)
+
+        async def update_fivem_status_loop(self):
+            if args.upstream:
+                await super().update_fivem_status_loop()
+
+        def servers_updated(self, updated):
+            probe_latencies.extend(monitored.server.request_duration * 1000 for monitored in updated)
+            super().servers_updated(updated)
+
+    probe_latencies = []
+
+    client = BenchClient(intents=discord.Intents.none())
+    await client.on_ready()
+    lag = []
+    message_durations = []
+    tasks = [asyncio.ensure_future(measure_loop_lag(lag))]
+    if args.messages_per_second:
+        tasks.append(asyncio.ensure_future(
+            replay_messages(client, api, args.messages_per_second, message_durations, bot.FIVEM_BOT_ID)
+        ))
+    started = time()
+    await asyncio.sleep(args.duration)
+    elapsed = time() - started
+    for task in tasks:
+        task.cancel()
+    if client.worker is not None:
+        await client.worker.stop()
+    for monitored in bot.MONITORED_SERVERS:
+        monitored.history.close()
+    await bot.fleet.close()
+    for server in fake_servers:
+        await server.stop()
+    shutil.rmtree(directory, ignore_errors=True)
+
+    delays = detection_delays(fake_servers, api)
+    print("servers:              {}".format(args.servers))
+    print("duration:             {:.1f} s".format(elapsed))
+    print("probes:               {}".format(len(probe_latencies)))
+    print("server requests:      http {}  udp {}".format(
+        sum(server.requests for server in fake_servers), sum(server.udp_requests for server in fake_servers)))
+    print("hedged requests:      {}".format(sum(m.server.hedged_requests for m in bot.MONITORED_SERVERS)))
+    print("probe latency:        p50 {:.1f} ms  p95 {:.1f} ms  p99 {:.1f} ms".format(
+        percentile(probe_latencies, 50), percentile(probe_latencies, 95), percentile(probe_latencies, 99)))
+    print("event loop lag:       p50 {:.2f} ms  p99 {:.2f} ms  max {:.2f} ms".format(
+        percentile(lag, 50) * 1000, percentile(lag, 99) * 1000, max(lag or [0]) * 1000))
+    print("discord requests:     {} ({} rate limited)".format(len(api.requests), api.rate_limited))
+    print("edits per minute:     {:.1f}".format(len(api.edits) / elapsed * 60))
+    if delays:
+        print("detection delay:      mean {:.2f} s  max {:.2f} s  ({} changes)".format(
+            statistics.mean(delays), max(delays), len(delays)))
+    if message_durations:
+        print("on_message:           {} messages  p50 {:.1f} us  p99 {:.1f} us".format(
+            len(message_durations), percentile(message_durations, 50) * 1e6, percentile(message_durations, 99) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=5, help="amount of fake FiveM servers")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--players", type=int, default=64, help="players per fake server")
+    parser.add_argument("--latency", type=float, default=0.02, help="response delay of the fake servers in seconds")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests that time out")
+    parser.add_argument("--flap-period", type=float, default=0, help="toggle online/offline every this many seconds")
+    parser.add_argument("--interval", type=int, default=2, help="status-update-interval of the bot")
+    parser.add_argument("--min-interval", type=float, default=0, help="status-update-min-interval of the bot")
+    parser.add_argument("--max-interval", type=float, default=0, help="status-update-max-interval of the bot")
+    parser.add_argument("--mirrors", type=int, default=0, help="mirror channels per server")
+    parser.add_argument("--probe", choices=("http", "udp", "count", "dynamic"), default="http", help="how the bot requests the servers")
+    parser.add_argument("--worker", action="store_true", help="request the servers in the probe worker process")
+    parser.add_argument("--concurrency", type=int, default=20, help="max-concurrent-probes of the bot")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="duration of a discord request")
+    parser.add_argument("--messages-per-second", type=float, default=20, help="replayed chat messages per second")
+    parser.add_argument("--upstream", action="store_true", help="also fetch the real cfx.re and down detector status")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
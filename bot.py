@@ -1,40 +1,334 @@
 #!/usr/bin/python3
 import asyncio
 import configparser
+import functools
+import io
 import logging
 import os
-import random
+import re
 import sys
-import traceback
+from abc import ABC, abstractmethod
 from datetime import datetime
 from time import time
+from typing import List
 
+import aiohttp
 import discord
-import requests
 
+import dashboard
 import fivem
 
-logging.basicConfig(
-    filename=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'latest.log'),
-    filemode="w",
-    level=logging.INFO,
-    format="%(asctime)s:%(levelname)s:%(message)s"
+PROJECT_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+# the config path can be overridden, e.g. by the benchmark harness
+config.read(os.environ.get("DASHBOARD_CONFIG", os.path.join(PROJECT_DIRECTORY, 'config.ini')))
+DATA_DIRECTORY = config.get("Settings", "data-directory", fallback="") or PROJECT_DIRECTORY
+
+dashboard.setup_logging(
+    # the probe worker logs into its own file
+    os.path.join(DATA_DIRECTORY, os.environ.get("DASHBOARD_LOG_FILE", 'latest.log')),
+    max_bytes=config.getint("Logging", "max-bytes", fallback=5 * 2 ** 20),
+    backup_count=config.getint("Logging", "backup-count", fallback=7),
+    interval=config.getfloat("Logging", "rotate-interval", fallback=86400),
+    burst=config.getint("Logging", "rate-limit-burst", fallback=5),
+    period=config.getfloat("Logging", "rate-limit-period", fallback=60),
 )
 logging.info("Started with python version " + sys.version)
-config = configparser.ConfigParser()
-config.read(os.path.join(os.path.dirname(os.path.realpath(__file__)), 'config.ini'))
 
 STATUS_UPDATE_INTERVAL = int(config.get("Settings", "status-update-interval"))
-STATUS_CHANNEL_ID = int(config.get("Settings", "status-channel-id"))
 FIVEM_BOT_ID = int(config.get("Restart-Detection", "fivem-status-bot-id"))
 RESTART_MESSAGE = str(config.get("Restart-Detection", "restart-detection-message"))
 RESTART_WARN_MSG = str(config.get("Restart-Detection", "restart-warn-message"))
 RESTART_WARN_DELAY = int(config.get("Restart-Detection", "restart-warn-delay"))
-FIVEM_SERVER_IP = str(config.get("Settings", "fivem-server-ip"))
-SERVER_DOMAIN = str(config.get("Status-Message", "fivem-domain"))
-FIVEM_MAX_PLAYERS = str(config.get("Settings", "max-players"))
 
-fiveMServer = fivem.Server(ip=FIVEM_SERVER_IP)
+
+def load_restart_matcher() -> dashboard.PhraseMatcher:
+    """Creates the matcher for the restart messages of the FiveM discord bot from the config.
+    A match returns 0 for a restart which happens now, otherwise the minutes until the restart.
+
+    :return: The matcher
+    :rtype: dashboard.PhraseMatcher
+    """
+    matcher = dashboard.PhraseMatcher()
+    matcher.add(RESTART_MESSAGE, 0)
+    for phrase in config.get("Restart-Detection", "restart-detection-messages", fallback="").splitlines():
+        matcher.add(phrase, 0)
+    matcher.add(RESTART_WARN_MSG, RESTART_WARN_DELAY)
+    for line in config.get("Restart-Detection", "restart-warn-messages", fallback="").splitlines():
+        phrase, _, delay = line.rpartition("|")
+        if phrase.strip() and delay.strip().isdigit():
+            matcher.add(phrase, int(delay))
+        elif line.strip():
+            logging.warning("ignored restart warn message without delay: " + line)
+    return matcher
+
+
+RESTART_MATCHER = load_restart_matcher()
+MAX_CONCURRENT_PROBES = config.getint("Settings", "max-concurrent-probes", fallback=20)
+HOST_PROBE_INTERVAL = config.getfloat("Settings", "host-probe-interval", fallback=0.0)
+FIVEM_STATUS_CACHE_TTL = config.getfloat("Settings", "fivem-status-cache-ttl", fallback=30)
+FIVEM_STATUS_STALE_TTL = config.getfloat("Settings", "fivem-status-stale-ttl", fallback=600)
+FIVEM_STATUS_TIMEOUT = config.getfloat("Settings", "fivem-status-timeout", fallback=6)
+STATUS_UPDATE_MIN_INTERVAL = config.getfloat("Settings", "status-update-min-interval", fallback=STATUS_UPDATE_INTERVAL)
+STATUS_UPDATE_MAX_INTERVAL = config.getfloat("Settings", "status-update-max-interval", fallback=STATUS_UPDATE_INTERVAL)
+STATUS_UPDATE_JITTER = config.getfloat("Settings", "status-update-jitter", fallback=0.1)
+STATUS_UPDATE_STABLE_AFTER = config.getfloat("Settings", "status-update-stable-after", fallback=300)
+METRICS_ENABLED = config.getboolean("Metrics", "enabled", fallback=False)
+METRICS_HOST = config.get("Metrics", "host", fallback="127.0.0.1")
+METRICS_PORT = config.getint("Metrics", "port", fallback=9108)
+INGEST_ENABLED = config.getboolean("Ingest", "enabled", fallback=False)
+INGEST_HOST = config.get("Ingest", "host", fallback="127.0.0.1")
+INGEST_PORT = config.getint("Ingest", "port", fallback=9109)
+INGEST_SECRET = config.get("Ingest", "secret", fallback="")
+STATUS_MESSAGES_FILE = os.path.join(DATA_DIRECTORY, "status-messages.json")
+SERVER_STATE_FILE = os.path.join(DATA_DIRECTORY, "server-state.json")
+CHART_MESSAGES_FILE = os.path.join(DATA_DIRECTORY, "chart-messages.json")
+SNAPSHOT_INTERVAL = config.getint("Settings", "snapshot-interval", fallback=30)
+SNAPSHOT_MAX_AGE = config.getint("Settings", "snapshot-max-age", fallback=3600)
+HISTORY_CAPACITY = config.getint("Settings", "history-capacity", fallback=131072)
+FIVEM_STATUS_MIN_INTERVAL = config.getfloat("Settings", "fivem-status-min-interval", fallback=33)
+FIVEM_STATUS_MAX_INTERVAL = config.getfloat("Settings", "fivem-status-max-interval", fallback=38)
+PROBE_WORKER = config.getboolean("Settings", "probe-worker", fallback=False)
+SERVER_PROBE = config.get("Settings", "probe", fallback="http")
+FULL_REFRESH_INTERVAL = config.getfloat("Settings", "full-refresh-interval", fallback=300)
+CHART_CHANNEL_ID = config.getint("Settings", "chart-channel-id", fallback=0)
+CHART_UPDATE_INTERVAL = config.getfloat("Settings", "chart-update-interval", fallback=600)
+
+
+class StatusTarget:
+    """A channel in which the status message of a server is displayed"""
+
+    def __init__(self, channel_id: int, key: str, mirror: bool = False):
+        self.channel_id: int = channel_id
+        """The ID of the channel in which the status message should appear"""
+        self.key: str = key
+        """Identifies the status message in the saved status messages"""
+        self.mirror: bool = mirror
+        """Whether the channel is a mirror, e.g. in a partner guild. The bot never deletes other messages there"""
+        self.channel = None
+        """The GuildChannel or TextChannel in which the status message should be send in"""
+        self.message: discord.Message = None
+        """The status message to be updated"""
+        self.editor: dashboard.StatusEditor = None
+        """Sends the edits of the status message. Every target is rate limited on its own"""
+
+
+class MonitoredServer:
+    """A FiveM server together with the settings and the messages to display its status"""
+
+    def __init__(self, server: fivem.Server, **kwargs):
+        self.server: fivem.Server = server
+        """The FiveM server"""
+        self.display_name: str = kwargs.get("display_name", "FlixRP")
+        """The name of the server in the status message"""
+        self.domain: str = kwargs.get("domain")
+        """The domain or ip which is just displayed in the status message"""
+        self.max_players: str = kwargs.get("max_players")
+        """The maximum players which are displayed in the status message"""
+        self.status_channel_id: int = kwargs.get("status_channel_id")
+        """The ID of the channel in which the status message should appear"""
+        self.restart_bot_id: int = kwargs.get("restart_bot_id", FIVEM_BOT_ID)
+        """The ID of the FiveM discord bot whose messages are used for the restart detection"""
+        self.player_log_channel_id: int = kwargs.get("player_log_channel_id", 0)
+        """The ID of the channel in which joining and leaving players are logged. 0 to disable"""
+        self.targets: List[StatusTarget] = [StatusTarget(self.status_channel_id, server.name)] + [
+            StatusTarget(channel_id, server.name + "@" + str(channel_id), mirror=True)
+            for channel_id in kwargs.get("mirror_channel_ids", ()) if channel_id != self.status_channel_id
+        ]
+        """The channels in which the status is displayed. The first one is the status channel"""
+        self.scheduler = fivem.ServerPollScheduler(
+            server,
+            min_interval=STATUS_UPDATE_MIN_INTERVAL,
+            max_interval=STATUS_UPDATE_MAX_INTERVAL,
+            jitter=STATUS_UPDATE_JITTER,
+            stable_after=STATUS_UPDATE_STABLE_AFTER,
+        )
+        """Decides when the server is requested the next time"""
+        self.history = fivem.History(
+            os.path.join(
+                DATA_DIRECTORY,
+                "history-" + re.sub(r"[^A-Za-z0-9_-]", "_", server.name) + ".dat",
+            ),
+            capacity=HISTORY_CAPACITY,
+        )
+        """The persisted history of the requested states"""
+        self.rollup = fivem.MinuteRollup()
+        """The requested states of the last 24 hours per minute, for the chart"""
+        for timestamp, state, players in self.history.samples(time() - self.rollup.minutes * 60, time()):
+            self.rollup.add(timestamp, state == fivem.State.ONLINE, players)
+        self.chart = dashboard.TrendChart(
+            self.rollup, int(self.max_players) if str(self.max_players).isdigit() else None
+        )
+        """The player and availability chart of the last 24 hours"""
+
+    def publish(self, embed: discord.Embed) -> List[asyncio.Future]:
+        """Sends the embed to all status messages of the server at the same time.
+        A slow or broken channel does not delay the others.
+
+        :return: The futures which are done when the status messages were edited
+        :rtype: List[asyncio.Future]
+        """
+        return [target.editor.submit(embed) for target in self.targets]
+
+    @property
+    def title(self) -> str:
+        """The author name of the status message, used to recognize it in the channel"""
+        return self.display_name + " Server Status"
+
+
+def parse_duration(text: str) -> int:
+    """Parses a duration like ``30m``, ``12h`` or ``7d`` into seconds
+
+    :param text: The duration. A number followed by m, h or d
+    :type text: str
+    :return: The seconds or 0 when the text is not a valid duration
+    :rtype: int
+    """
+    match = re.fullmatch(r"(\d+)([mhd])", text.strip())
+    if not match:
+        return 0
+    return int(match.group(1)) * {"m": 60, "h": 3600, "d": 86400}[match.group(2)]
+
+
+def parse_ids(text: str) -> List[int]:
+    """Parses a comma or whitespace separated list of IDs"""
+    return [int(part) for part in re.split(r"[\s,]+", text.strip()) if part]
+
+
+def load_monitored_servers() -> list:
+    """Creates the monitored servers from the config.
+    Every section named ``[Server:<name>]`` is one server. Without such sections,
+    the single server from the ``[Settings]`` section is used.
+
+    :return: The monitored servers
+    :rtype: List[MonitoredServer]
+    """
+    monitored = []
+    for section in config.sections():
+        if not section.startswith("Server:"):
+            continue
+        name = section[len("Server:"):].strip()
+        monitored.append(MonitoredServer(
+            fivem.Server(
+                ip=config.get(section, "fivem-server-ip"),
+                name=name,
+                track_players=config.getint(section, "player-log-channel-id", fallback=0) > 0,
+                probe=config.get(section, "probe", fallback=SERVER_PROBE),
+                full_refresh_interval=config.getfloat(section, "full-refresh-interval", fallback=FULL_REFRESH_INTERVAL),
+            ),
+            display_name=config.get(section, "display-name", fallback=name),
+            domain=config.get(section, "fivem-domain"),
+            max_players=config.get(section, "max-players"),
+            status_channel_id=config.getint(section, "status-channel-id"),
+            mirror_channel_ids=parse_ids(config.get(section, "mirror-channel-ids", fallback="")),
+            restart_bot_id=config.getint(section, "fivem-status-bot-id", fallback=FIVEM_BOT_ID),
+            player_log_channel_id=config.getint(section, "player-log-channel-id", fallback=0),
+        ))
+    if not monitored:
+        monitored.append(MonitoredServer(
+            fivem.Server(
+                ip=str(config.get("Settings", "fivem-server-ip")),
+                name="default",
+                track_players=config.getint("Settings", "player-log-channel-id", fallback=0) > 0,
+                probe=SERVER_PROBE,
+                full_refresh_interval=FULL_REFRESH_INTERVAL,
+            ),
+            domain=str(config.get("Status-Message", "fivem-domain")),
+            max_players=str(config.get("Settings", "max-players")),
+            status_channel_id=int(config.get("Settings", "status-channel-id")),
+            mirror_channel_ids=parse_ids(config.get("Settings", "mirror-channel-ids", fallback="")),
+            player_log_channel_id=config.getint("Settings", "player-log-channel-id", fallback=0),
+        ))
+    return monitored
+
+
+MONITORED_SERVERS = load_monitored_servers()
+MONITORED_SERVERS_BY_RESTART_BOT = {}
+"""The monitored servers by the ID of the FiveM discord bot which announces their restarts"""
+MONITORED_SERVERS_BY_NAME = {}
+"""The monitored servers by the name of their FiveM server"""
+fleet = fivem.Fleet(max_concurrency=MAX_CONCURRENT_PROBES, host_interval=HOST_PROBE_INTERVAL)
+_snapshots = dashboard.read_json(SERVER_STATE_FILE, {})
+for _monitored in MONITORED_SERVERS:
+    fleet.add(_monitored.server)
+    MONITORED_SERVERS_BY_NAME[_monitored.server.name] = _monitored
+    MONITORED_SERVERS_BY_RESTART_BOT.setdefault(_monitored.restart_bot_id, []).append(_monitored)
+    # restore the state from before the last restart of the bot
+    if _monitored.server.name in _snapshots and \
+            _monitored.server.restore(_snapshots[_monitored.server.name], max_age=SNAPSHOT_MAX_AGE):
+        logging.info("restored the state of " + _monitored.server.name)
+del _monitored, _snapshots
+
+
+def server_states() -> dict:
+    """Takes a snapshot of the state of all servers, by their name"""
+    return {monitored.server.name: monitored.server.snapshot(with_players=True) for monitored in MONITORED_SERVERS}
+
+
+def save_server_states(states: dict = None):
+    """Saves the state of all servers atomically, so it can be restored after a restart
+
+    :param states: The snapshot of :func:`server_states` to save. Taken now when it is not given
+    :type states: dict
+    """
+    try:
+        dashboard.write_json_atomic(SERVER_STATE_FILE, server_states() if states is None else states)
+    except OSError as e:
+        logging.error("failed to save the server states", exc_info=e)
+
+
+def write_to_disk(states: dict):
+    """Saves the server states and flushes the histories. Blocks on the disk, so it runs in an executor
+
+    :param states: The snapshot of :func:`server_states` to save
+    :type states: dict
+    """
+    save_server_states(states)
+    for monitored in MONITORED_SERVERS:
+        monitored.history.flush()
+
+
+upstream_cache = fivem.UpstreamCache(ttl=FIVEM_STATUS_CACHE_TTL, stale_ttl=FIVEM_STATUS_STALE_TTL)
+upstream_scheduler = fivem.PollScheduler(
+    min_interval=FIVEM_STATUS_MIN_INTERVAL,
+    max_interval=FIVEM_STATUS_MAX_INTERVAL,
+    jitter=STATUS_UPDATE_JITTER,
+    stable_after=STATUS_UPDATE_STABLE_AFTER,
+)
+
+
+class Metrics:
+    """The metrics exposed on the metrics endpoint"""
+    REQUEST_STATE = dashboard.Histogram(
+        "fivem_request_state_seconds", "Duration of the status requests to the FiveM servers", ["server"])
+    CFX_STATUS = dashboard.Histogram("fivem_cfx_status_seconds", "Duration of fetching the cfx.re status")
+    DOWN_DETECTOR = dashboard.Histogram(
+        "fivem_down_detector_seconds", "Duration of fetching the AlleStörungen.de status")
+    CFX_DETAILS = dashboard.Histogram(
+        "fivem_cfx_details_seconds", "Duration of fetching the cfx.re components and incidents", ["endpoint"])
+    EDIT_STATUS_MESSAGE = dashboard.Histogram(
+        "dashboard_edit_status_message_seconds", "Duration of editing a status message", ["server", "channel"])
+    STATE_TRANSITIONS = dashboard.Counter(
+        "fivem_state_transitions_total", "State changes of the FiveM servers", ["server", "state"])
+    SKIPPED_UPDATES = dashboard.Counter(
+        "dashboard_skipped_status_updates_total", "Status updates skipped because editing failed", ["server"])
+    HISTORY_REUSES = dashboard.Counter(
+        "dashboard_history_reuses_total", "Status messages recovered from the channel history", ["server"])
+    CHANNEL_PURGES = dashboard.Counter(
+        "dashboard_channel_purges_total", "Status channel purges before resending a status message", ["server"])
+    LOOP_LAG = dashboard.Gauge("dashboard_event_loop_lag_seconds", "How late the event loop wakes up")
+    INGESTED_EVENTS = dashboard.Counter(
+        "dashboard_ingested_events_total", "Events pushed by the FiveM servers to the ingest endpoint", ["server", "type"])
+
+
+UPSTREAM_SOURCES = {
+    "cfx_status": (fivem.cfx_status, functools.partial(Metrics.CFX_STATUS.time), True),
+    "cfx_components": (fivem.cfx_components, functools.partial(Metrics.CFX_DETAILS.time, endpoint="components"), False),
+    "cfx_incidents": (fivem.cfx_incidents, functools.partial(Metrics.CFX_DETAILS.time, endpoint="incidents"), False),
+    "down_detector": (fivem.down_detector, functools.partial(Metrics.DOWN_DETECTOR.time), True),
+}
+"""The fetch function, the metric timer and whether errors are displayed, by the key in the upstream cache.
+Sources without displayed errors show nothing when they have no usable value"""
 
 
 def get_timestamp() -> int:
@@ -84,188 +378,393 @@ class Intervals:
     """How many seconds one minute has"""
 
 
-class Client(discord.Client):
-    skipped_status_update: bool = False
-
-    status_message: discord.Message = None
-    """The status message to be updated"""
-    status_channel = None
-    """The GuildChannel or TextChannel in which the status message should be send in"""
+class StatusDashboard(ABC):
+    """Requests the servers and renders their status messages.
+    The subclasses decide how the status messages are sent to discord"""
     show_uptime: bool = True
     """Whether the uptime should be displayed"""
-    cfx_status: str = ""
-    """The status message from the official website of fivem"""
-    down_detector_status: str = ""
-    """The status message from down detector website"""
     show_cfx_status: bool = True
     """Whether the official cfx server status should be displayed in the status message"""
     show_down_detector_status: bool = True
     """Whether the down detector status should be displayed in the status message"""
+    poll_wakeup: asyncio.Event = None
+    """Wakes up the status-update loop before the next scheduled request, e.g. after a restart was detected"""
+    loop: asyncio.AbstractEventLoop = None
+    """The event loop the loops of the dashboard run in"""
+    worker: dashboard.WorkerSupervisor = None
+    """Runs the probe worker, when the servers are requested in a separate process"""
+    upstream_session: aiohttp.ClientSession = None
+    """The pooled HTTP session for the fivem status from status.cfx.re and AlleStörungen.de"""
+    tasks: List[asyncio.Task] = None
+    """The loops of the dashboard, cancelled before the connections and the history files are released"""
 
-    def __init__(self, *, loop=None, **options):
-        super().__init__(loop=loop, **options)
-        self.loop.create_task(self.update_status_loop())
-        self.loop.create_task(self.update_fivem_status_loop())
+    def start_dashboard(self):
+        """Creates the status editors of all targets and starts the loops of the dashboard"""
+        self.poll_wakeup = asyncio.Event()
+        for monitored in MONITORED_SERVERS:
+            for target in monitored.targets:
+                target.editor = dashboard.StatusEditor(functools.partial(self.edit_status_message, monitored, target))
+        if PROBE_WORKER:
+            # the worker requests the servers and the fivem status, this process only renders and publishes
+            self.worker = dashboard.WorkerSupervisor(
+                [sys.executable, os.path.join(PROJECT_DIRECTORY, "worker.py")],
+                self.apply_worker_message,
+                env=dict(os.environ, DASHBOARD_LOG_FILE="worker.log"),
+            )
+            self.tasks = [self.loop.create_task(self.worker.run())]
+        else:
+            self.tasks = [
+                self.loop.create_task(self.update_status_loop()),
+                self.loop.create_task(self.update_fivem_status_loop()),
+            ]
+        self.tasks.append(self.loop.create_task(self.snapshot_loop()))
+        if METRICS_ENABLED:
+            self.tasks.append(self.loop.create_task(self.start_metrics()))
+        if INGEST_ENABLED:
+            self.tasks.append(self.loop.create_task(self.start_ingest()))
 
-    async def on_error(self, *args, **kwargs):
-        logging.error(traceback.format_exc())
+    async def stop_dashboard(self):
+        """Saves the server states and releases the connections and the history files"""
+        if self.worker is not None:
+            await self.worker.stop()
+        # no loop may wake up and use the sessions or the histories after they were closed
+        for task in self.tasks or ():
+            task.cancel()
+        await asyncio.gather(*self.tasks or (), return_exceptions=True)
+        save_server_states()
+        await fleet.close()
+        if self.upstream_session is not None:
+            await self.upstream_session.close()
+        for monitored in MONITORED_SERVERS:
+            monitored.history.close()
 
-    async def on_ready(self):
-        print("Logged in as " + str(self.user.name) + " (" + str(self.user.id) + ")")
-        logging.info("Logged in as " + str(self.user.name) + " (" + str(self.user.id) + ")")
-        self.status_channel = self.get_channel(STATUS_CHANNEL_ID)
+    async def start_metrics(self):
+        """Serves the metrics endpoint and measures the event loop lag"""
+        try:
+            await dashboard.start_metrics_server(METRICS_HOST, METRICS_PORT)
+            logging.info("Serving metrics on http://" + METRICS_HOST + ":" + str(METRICS_PORT) + "/metrics")
+        except OSError as e:
+            logging.error("failed to start the metrics endpoint", exc_info=e)
+            return
+        await dashboard.monitor_loop_lag(Metrics.LOOP_LAG)
 
-    async def on_message(self, message):
-        lower_message = message.content.lower()
-        if message.author.bot and message.author.id == FIVEM_BOT_ID:
-            if RESTART_MESSAGE.lower() in lower_message:
-                fiveMServer.set_state_restarting()
-                # update status message
-                await self.edit_status_message(self.create_status_restart())
-
-            elif RESTART_WARN_MSG.lower() in lower_message:
-                fiveMServer.next_restart = (get_timestamp() + RESTART_WARN_DELAY * Intervals.MINUTE)
-        elif lower_message.startswith("!toggleuptimevisibility") and message.author.guild_permissions.administrator:
-            if self.show_uptime:
-                self.show_uptime = False
-                await message.channel.send("Onlinezeit wird nicht mehr angezeigt :mute:")
-            else:
-                self.show_uptime = True
-                await message.channel.send("Onlinezeit wird wieder angezeigt :sound:")
-        elif lower_message.startswith("!fivem"):
-            async with message.channel.typing():
-                embed = discord.Embed()
-                embed.set_author(
-                    name="FiveM Status",
-                    icon_url="https://fivem.net/favicon.png",
-                    url="https://status.cfx.re/",
-                )
-                embed.set_footer(text="FlixRP", icon_url="https://verwaltung.flixrp.net/favicon-32x32.png")
-                embed.timestamp = datetime.utcnow()
-                embed.add_field(
-                    name="\u200b",
-                    value="**FiveM Status von [status.cfx.re](https://status.cfx.re/)**\n" +
-                          self.add_dot_to_fivem_status(self.cfx_status),
-                    inline=True,
-                )
-                embed.add_field(
-                    name="\u200b",
-                    value="**FiveM Status von [Allestörungen.de](https://allestörungen.de/stoerung/fivem/)**\n" +
-                          self.add_dot_to_fivem_status(self.down_detector_status),
-                    inline=True,
-                )
-                await message.channel.send(embed=embed)
-        elif lower_message.startswith("!togglecfxstatus") and message.author.guild_permissions.administrator:
-            if self.show_cfx_status:
-                self.show_cfx_status = False
-                await message.channel.send("Der FiveM Status von `status.cfx.re` wird nicht mehr angezeigt :mute:")
-            else:
-                self.show_cfx_status = True
-                await message.channel.send("Der FiveM Status von `status.cfx.re` wird wieder angezeigt :sound:")
-        elif lower_message.startswith("!toggledowndetectorstatus") and message.author.guild_permissions.administrator:
-            if self.show_down_detector_status:
-                self.show_down_detector_status = False
-                await message.channel.send("Der FiveM Status von `AlleStörungen.de` wird nicht mehr angezeigt :mute:")
-            else:
-                self.show_down_detector_status = True
-                await message.channel.send("Der FiveM Status von `AlleStörungen.de` wird wieder angezeigt :sound:")
+    async def start_ingest(self):
+        """Serves the endpoint to which the FiveM servers push their events"""
+        try:
+            await dashboard.start_ingest_server(INGEST_HOST, INGEST_PORT, INGEST_SECRET, self.apply_event)
+            logging.info("Accepting events on http://" + INGEST_HOST + ":" + str(INGEST_PORT) + "/events")
+        except (OSError, ValueError) as e:
+            logging.error("failed to start the ingest endpoint", exc_info=e)
 
-    async def on_connect(self):
-        fiveMServer.last_offline = 0
-        fiveMServer.last_online = 0
-        fiveMServer.next_restart = 0
+    @staticmethod
+    def count_transition(monitored: MonitoredServer, previous_state):
+        """Counts the state change of the server in the metrics"""
+        if monitored.server.state != previous_state:
+            Metrics.STATE_TRANSITIONS.inc(server=monitored.server.name, state=monitored.server.state.name.lower())
 
-    async def edit_status_message(self, embed):
-        # noinspection PyBroadException
-        try:
-            await self.status_message.edit(embed=embed, content=None, suppress=False)
-            self.skipped_status_update = False
-        except:
-            if not self.skipped_status_update:
-                # skips one update interval before resending the hole status message
-                logging.warning("skipped status update")
-                self.skipped_status_update = True
-            else:
-                self.skipped_status_update = False
-                # try to get a message from the channel history before resending the hole status message
-                try:
-                    async for message in self.get_channel(STATUS_CHANNEL_ID).history(limit=10):
-                        if message.author.bot and message.author.id == self.user.id:  # check if its from the bot itself
-                            await message.edit(embed=embed, content=None, suppress=False)
-                            self.status_message = message
-                            logging.info("reused status message from history")
-                            return
-                except Exception as e:
-                    logging.error("failed to edit message from history", exc_info=e)
-                # resend the status message
-                try:
-                    await self.status_channel.purge(bulk=True)
-                except Exception as e:
-                    logging.error("cannot clean up status channel", exc_info=e)
-                    return
-                try:
-                    self.status_message = await self.status_channel.send(embed=embed)
-                    logging.info("re sent status message")
-                except Exception as e:
-                    logging.error("failed to send the status message.", exc_info=e)
+    @property
+    def cfx_status(self) -> str:
+        """The cached status message from the official website of fivem"""
+        return upstream_cache.get("cfx_status", ":grey_question: Keine Daten")
+
+    @property
+    def down_detector_status(self) -> str:
+        """The cached status message from down detector website"""
+        return upstream_cache.get("down_detector", ":grey_question: Keine Daten")
+
+    @property
+    def cfx_components(self) -> str:
+        """The cached components of fivem which are not operational, one per line"""
+        return upstream_cache.get("cfx_components")
+
+    @property
+    def cfx_incidents(self) -> str:
+        """The cached unresolved incidents from the official website of fivem, one per line"""
+        return upstream_cache.get("cfx_incidents")
+
+    async def snapshot_loop(self):
+        """Loop for saving the server states and the history to the disk"""
+        while True:
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+            # the snapshot is taken on the loop, only writing it blocks
+            await self.loop.run_in_executor(None, write_to_disk, server_states())
+
+    @abstractmethod
+    async def edit_status_message(self, monitored: MonitoredServer, target, embed) -> bool:
+        """Edits the status message of the server in the target.
+        Use the :class:`dashboard.StatusEditor` of the target instead of calling this directly.
+
+        :return: Whether the status message shows the embed afterwards
+        :rtype: bool
+
+        :raises discord.HTTPException: When discord rate limited the request
+        """
+
+    def create_status(self, monitored: MonitoredServer) -> discord.Embed:
+        """Creates the status message matching the current state of the server"""
+        if monitored.server.is_online():
+            return self.create_status_online(monitored)
+        elif monitored.server.is_restarting():
+            return self.create_status_restart(monitored)
+        elif monitored.server.is_not_reachable():
+            return self.create_status_not_reachable(monitored)
+        else:
+            return self.create_status_offline(monitored)
 
     async def update_status_loop(self):
         """Loop for updating the server-status"""
         logging.info("Starting status-update loop")
+        await asyncio.sleep(STATUS_UPDATE_INTERVAL)
         while True:
-            await asyncio.sleep(STATUS_UPDATE_INTERVAL)
-            fiveMServer.request_state()
-            if fiveMServer.is_online():
-                embed = self.create_status_online()
-            elif fiveMServer.is_restarting():
-                embed = self.create_status_restart()
-            elif fiveMServer.is_not_reachable():
-                embed = self.create_status_not_reachable()
+            due = [monitored for monitored in MONITORED_SERVERS if monitored.scheduler.is_due()]
+            if due:
+                previous_states = [monitored.server.state for monitored in due]
+                await fleet.request_states(monitored.server for monitored in due)
+                for monitored, previous_state in zip(due, previous_states):
+                    Metrics.REQUEST_STATE.observe(monitored.server.request_duration, server=monitored.server.name)
+                    self.count_transition(monitored, previous_state)
+                    monitored.scheduler.reschedule_server()
+                self.servers_updated(due)
+            # sleep until the next server is due or a restart was detected
+            self.poll_wakeup.clear()
+            delay = min(monitored.scheduler.due_at for monitored in MONITORED_SERVERS) - time()
+            try:
+                await asyncio.wait_for(self.poll_wakeup.wait(), timeout=max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    def servers_updated(self, updated: List[MonitoredServer]):
+        """Called after the states of the servers were requested.
+        Records them in the history and publishes the status messages of all servers"""
+        for monitored in updated:
+            monitored.history.append(time(), monitored.server.state, monitored.server.players, monitored.server.latency)
+            monitored.rollup.add(time(), monitored.server.is_online(), monitored.server.players)
+        # render every status once and send it to all its channels, without waiting for the edits
+        for monitored in MONITORED_SERVERS:
+            monitored.publish(self.create_status(monitored))
+
+    def announce_restart(self, monitored: MonitoredServer, delay: int):
+        """Applies a restart announcement of the server
+
+        :param delay: 0 when the server restarts now, otherwise the minutes until the restart
+        :type delay: int
+        """
+        if delay == 0:
+            self.restart_now(monitored)
+        else:
+            self.schedule_restart(monitored, get_timestamp() + delay * Intervals.MINUTE)
+
+    def restart_now(self, monitored: MonitoredServer):
+        """Shows that the server is restarting right now"""
+        previous_state = monitored.server.state
+        monitored.server.set_state_restarting()
+        self.count_transition(monitored, previous_state)
+        # update status message
+        monitored.publish(self.create_status_restart(monitored))
+        monitored.scheduler.reschedule_server()
+        self.poll_wakeup.set()
+        if self.worker is not None:
+            self.worker.send({"type": "restart", "server": monitored.server.name,
+                              "next_restart": monitored.server.next_restart, "now": True})
+
+    def schedule_restart(self, monitored: MonitoredServer, timestamp: int):
+        """Warns in the status message that the server restarts at the timestamp"""
+        monitored.server.next_restart = timestamp
+        if self.worker is not None:
+            self.worker.send({"type": "restart", "server": monitored.server.name,
+                              "next_restart": timestamp, "now": False})
+
+    def apply_event(self, event: dict):
+        """Applies an event which a FiveM server pushed to the ingest endpoint. The events are
+
+        - ``{"server": name, "type": "restart_scheduled", "at": timestamp}``
+        - ``{"server": name, "type": "restarting"}``
+        - ``{"server": name, "type": "players", "players": amount}``
+
+        The server name can be omitted when only one server is monitored.
+
+        :raises ValueError: When the event is invalid or the server is unknown
+        """
+        if "server" in event:
+            monitored = MONITORED_SERVERS_BY_NAME.get(event["server"])
+        elif len(MONITORED_SERVERS) == 1:
+            monitored = MONITORED_SERVERS[0]
+        else:
+            raise ValueError("the server is missing")
+        if monitored is None:
+            raise ValueError("unknown server " + str(event["server"]))
+        kind = event.get("type")
+        if kind == "restart_scheduled":
+            timestamp = int(event["at"])
+            if timestamp <= get_timestamp():
+                raise ValueError("the restart is in the past")
+            self.schedule_restart(monitored, timestamp)
+            monitored.publish(self.create_status(monitored))
+        elif kind == "restarting":
+            self.restart_now(monitored)
+        elif kind == "players":
+            players = int(event["players"])
+            if players < 0:
+                raise ValueError("negative players")
+            monitored.server.players = players
+            if self.worker is not None:
+                self.worker.send({"type": "players", "server": monitored.server.name, "players": players})
+            if monitored.server.is_online():
+                monitored.publish(self.create_status(monitored))
             else:
-                embed = self.create_status_offline()
+                # the server answers again, request its state now
+                monitored.scheduler.wake()
+                self.poll_wakeup.set()
+        else:
+            raise ValueError("unknown event type " + str(kind))
+        Metrics.INGESTED_EVENTS.inc(server=monitored.server.name, type=kind)
 
-            await self.edit_status_message(embed)
+    def apply_worker_message(self, message: dict):
+        """Applies a message of the probe worker. See ``worker.py`` for the messages"""
+        kind = message.get("type")
+        if kind == "servers":
+            updated = []
+            for entry in message["servers"]:
+                monitored = MONITORED_SERVERS_BY_NAME.get(entry.get("server"))
+                if monitored is None:
+                    continue
+                previous_state = monitored.server.state
+                if not monitored.server.restore(entry["snapshot"], max_age=SNAPSHOT_MAX_AGE):
+                    continue
+                monitored.server.latency = entry.get("latency")
+                if monitored.server.latency is not None:
+                    monitored.server.latency_full = bool(entry.get("latency_full", True))
+                    monitored.server.add_latency_sample(monitored.server.latency, monitored.server.latency_full)
+                monitored.server.request_duration = float(entry.get("request_duration", 0.0))
+                Metrics.REQUEST_STATE.observe(monitored.server.request_duration, server=monitored.server.name)
+                self.count_transition(monitored, previous_state)
+                updated.append(monitored)
+            if updated:
+                self.servers_updated(updated)
+        elif kind == "players":
+            monitored = MONITORED_SERVERS_BY_NAME.get(message.get("server"))
+            if monitored is None or monitored.server.player_index is None:
+                pass
+            elif "seed" in message:
+                # the players who were online when the worker started, not reported as joined
+                monitored.server.player_index.restore([fivem.Player.from_dict(player) for player in message["seed"]])
+            else:
+                monitored.server.player_index.replay(
+                    [fivem.Player.from_dict(player) for player in message["joined"]],
+                    [fivem.Player.from_dict(player) for player in message["left"]],
+                )
+        elif kind == "upstream":
+            # an unchanged status is sent as well, so it does not expire in the cache of the bot
+            before = upstream_cache.get(message["key"])
+            upstream_cache.store(message["key"], str(message["value"]))
+            if upstream_cache.get(message["key"]) != before:
+                self.upstream_updated(message["key"])
+        else:
+            logging.warning("unknown message from the worker: " + str(kind))
 
     async def update_fivem_status_loop(self):
         """Loop for updating the official fivem-status"""
         logging.info("Starting fivem status-update loop")
+        self.upstream_session = fivem.create_session(limit=len(UPSTREAM_SOURCES))
+        failures = 0
         while True:
-            self.update_fivem_status()
-            # repeat around every half minute
-            await asyncio.sleep(33 + random.randint(0, 5))
+            urgent = self.has_fivem_problems()
+            # a failing upstream is not asked more often, so it is not revalidated before its cache expired
+            failed = await self.update_fivem_status(force=urgent and not failures)
+            failures = failures + 1 if failed else 0
+            if failures:
+                await asyncio.sleep(upstream_scheduler.back_off(failures))
+                continue
+            # repeat faster while fivem reports an outage
+            stable_seconds = min(upstream_cache.stable_seconds(key) for key in ("cfx_status", "down_detector"))
+            await asyncio.sleep(upstream_scheduler.reschedule(stable_seconds, urgent or self.has_fivem_problems()))
 
-    def update_fivem_status(self):
-        """Update the class attributes down_detector_status and cfx_status with helpers from the fivem package"""
-        try:
-            self.cfx_status = fivem.cfx_status()
-        except requests.exceptions.ConnectionError:
-            self.cfx_status = ":grey_question: Keine Verbindung"
-        except Exception as e:
-            logging.warning("failed to fetch cfx status from api", exc_info=e)
-            self.cfx_status = ":grey_question: Keine Daten"
+    def has_fivem_problems(self) -> bool:
+        """Check whether one of the fivem status sources reports an outage.
+        Unknown statuses and failed fetches do not count, they are no reason to ask the upstream more often"""
+        return any(
+            self.add_dot_to_fivem_status(status).startswith((":red_circle:", ":orange_circle:"))
+            for status in (self.cfx_status, self.down_detector_status)
+        )
+
+    async def update_fivem_status(self, force: bool = False) -> bool:
+        """Revalidate the cached fivem status of all sources at the same time with helpers from the fivem package.
+        All requests share one deadline, and every source is published as soon as it arrived.
+        A failed fetch keeps serving the last good status of its source until it expires.
+
+        :param force: Whether to revalidate the status even if the cached one is still fresh
+        :type force: bool
+        :return: Whether fetching one of the sources failed
+        :rtype: bool
+        """
+        keys = [key for key in UPSTREAM_SOURCES if force or not upstream_cache.is_fresh(key)]
+        results = await asyncio.gather(*(self.fetch_upstream(key, FIVEM_STATUS_TIMEOUT) for key in keys))
+        return not all(results)
+
+    async def fetch_upstream(self, key: str, timeout: float) -> bool:
+        """Revalidate the cached status of one source and publish it when it changed
+
+        :param key: The key of the source in :data:`UPSTREAM_SOURCES`
+        :type key: str
+        :param timeout: The seconds until the request is aborted
+        :type timeout: float
+        :return: Whether the status was fetched
+        :rtype: bool
+        """
+        fetch, timer, show_errors = UPSTREAM_SOURCES[key]
+        before = upstream_cache.get(key)
+        fetched = False
         try:
-            self.down_detector_status = fivem.down_detector()
-        except requests.exceptions.ConnectionError:
-            self.down_detector_status = ":grey_question: Keine Verbindung"
+            with timer():
+                await fetch(self.upstream_session, upstream_cache, timeout=timeout)
+            fetched = True
+        except asyncio.TimeoutError:
+            upstream_cache.fail(key, ":grey_question: Zeitüberschreitung" if show_errors else "")
+        except aiohttp.ClientConnectionError:
+            upstream_cache.fail(key, ":grey_question: Keine Verbindung" if show_errors else "")
         except Exception as e:
-            logging.warning("failed to fetch down detector status", exc_info=e)
-            self.down_detector_status = ":grey_question: Keine Daten"
+            logging.warning("failed to fetch the fivem status " + key, exc_info=e)
+            upstream_cache.fail(key, ":grey_question: Keine Daten" if show_errors else "")
+        if upstream_cache.get(key) != before:
+            self.upstream_updated(key)
+        elif fetched:
+            self.upstream_revalidated(key)
+        return fetched
+
+    def upstream_updated(self, key: str):
+        """Publishes the status messages again, because the fivem status of a source changed
+
+        :param key: The key of the source in the upstream cache
+        :type key: str
+        """
+        for monitored in MONITORED_SERVERS:
+            monitored.publish(self.create_status(monitored))
+
+    def upstream_revalidated(self, key: str):
+        """Called when the fivem status of a source was fetched again without a change.
+        The status messages already show it
+
+        :param key: The key of the source in the upstream cache
+        :type key: str
+        """
 
     @staticmethod
-    def create_status_template() -> discord.Embed:
+    def create_status_template(monitored: MonitoredServer) -> discord.Embed:
         embed = discord.Embed()
         embed.set_author(
-            name="FlixRP Server Status",
+            name=monitored.title,
             icon_url="https://verwaltung.flixrp.net/favicon-32x32.png",
             url="https://www.flixrp.net"
         )
         embed.add_field(
             name="**FiveM:**",
-            value="`" + SERVER_DOMAIN + "`",
+            value="`" + monitored.domain + "`",
             inline=False,
         )
         embed.set_footer(text="Zuletzt aktualisiert")
         embed.timestamp = datetime.utcnow()
+        if monitored.chart.url:
+            embed.set_image(url=monitored.chart.url)
         return embed
 
     def add_fivem_status_to_status_message(self, embed):
@@ -273,7 +772,7 @@ class Client(discord.Client):
             embed.add_field(
                 name="\u200b",
                 value=f"**FiveM Status von [status.cfx.re](https://status.cfx.re/)**\n"
-                      f"{self.add_dot_to_fivem_status(self.cfx_status)}\n\u200b",
+                      f"{self.add_dot_to_fivem_status(self.cfx_status)}{self.cfx_details()}\n\u200b",
                 inline=True,
             )
         if self.show_down_detector_status:
@@ -284,71 +783,91 @@ class Client(discord.Client):
                 inline=True,
             )
 
-    def create_status_online(self) -> discord.Embed:
-        embed = self.create_status_template()
-        embed.title = "**FlixRP** ist aktuell **Online!** :white_check_mark:\n\u200b"
+    def create_status_online(self, monitored: MonitoredServer) -> discord.Embed:
+        server = monitored.server
+        embed = self.create_status_template(monitored)
+        embed.title = "**" + monitored.display_name + "** ist aktuell **Online!** :white_check_mark:\n\u200b"
         embed.colour = 0x74EE15
         embed.add_field(
             name="**Spieler:**",
-            value="`" + str(fiveMServer.players) + " / " + FIVEM_MAX_PLAYERS + "`",
+            value="`" + str(server.players) + " / " + monitored.max_players + "`",
             inline=False,
         )
+        # the median is rounded, so the status message is not edited for every small change of the ping
+        if server.typical_latency is not None:
+            embed.add_field(
+                name="**Ping:**",
+                value="`" + str(max(10, int(round(server.typical_latency, -1)))) + " ms`",
+                inline=False,
+            )
         # add uptime field
-        if self.show_uptime and fiveMServer.get_uptime_seconds() > 60:
+        if self.show_uptime and server.get_uptime_seconds() > 60:
             embed.add_field(
                 name="**Onlinezeit:**",
-                value="`" + create_time_from_seconds(fiveMServer.get_uptime_seconds()) + "`",
+                value="`" + create_time_from_seconds(server.get_uptime_seconds()) + "`",
                 inline=False,
             )
         # add restart-warn-message
-        if fiveMServer.next_restart > get_timestamp():
-            diff = fiveMServer.next_restart - get_timestamp()
+        if server.next_restart > get_timestamp():
+            diff = server.next_restart - get_timestamp()
             r_time = int(diff / 60) + 1
             if r_time <= 1:
-                embed.description = ":warning: FlixRP wird gleich neu gestartet!\n\u200b"
+                embed.description = ":warning: " + monitored.display_name + " wird gleich neu gestartet!\n\u200b"
             else:
-                embed.description = ":warning: FlixRP wird in " + str(r_time) + " Minuten neu gestartet!\n\u200b"
+                embed.description = ":warning: " + monitored.display_name + " wird in " + str(r_time) + \
+                                    " Minuten neu gestartet!\n\u200b"
             del r_time
             del diff
         self.add_fivem_status_to_status_message(embed)
         return embed
 
-    def create_status_restart(self) -> discord.Embed:
-        embed = self.create_status_template()
-        embed.title = "**FlixRP** wird neu gestartet!\n\u200b"
+    def create_status_restart(self, monitored: MonitoredServer) -> discord.Embed:
+        embed = self.create_status_template(monitored)
+        embed.title = "**" + monitored.display_name + "** wird neu gestartet!\n\u200b"
         embed.colour = 0xFFAC00
         self.add_fivem_status_to_status_message(embed)
         return embed
 
-    def create_status_offline(self) -> discord.Embed:
-        embed = self.create_status_template()
-        embed.title = "**FlixRP** ist aktuell **Offline!** :no_entry:\n\u200b"
+    def create_status_offline(self, monitored: MonitoredServer) -> discord.Embed:
+        server = monitored.server
+        embed = self.create_status_template(monitored)
+        embed.title = "**" + monitored.display_name + "** ist aktuell **Offline!** :no_entry:\n\u200b"
         embed.colour = 0xFF0000
         # add downtime field
-        if fiveMServer.get_downtime_seconds() > 60:
+        if server.get_downtime_seconds() > 60:
             embed.add_field(
                 name="**Offlinezeit:**",
-                value="`" + create_time_from_seconds(fiveMServer.get_downtime_seconds()) + "`",
+                value="`" + create_time_from_seconds(server.get_downtime_seconds()) + "`",
                 inline=False,
             )
         self.add_fivem_status_to_status_message(embed)
         return embed
 
-    def create_status_not_reachable(self) -> discord.Embed:
-        embed = self.create_status_template()
-        embed.title = "**FlixRP** ist aktuell **Nicht erreichbar!** :no_entry:\n\u200b"
+    def create_status_not_reachable(self, monitored: MonitoredServer) -> discord.Embed:
+        server = monitored.server
+        embed = self.create_status_template(monitored)
+        embed.title = "**" + monitored.display_name + "** ist aktuell **Nicht erreichbar!** :no_entry:\n\u200b"
         embed.colour = 0xFF0000
-        embed.description = "```ping >3000```\n\u200b"
+        embed.description = "```ping >" + str(int(server.request_duration * 1000)) + " ms```\n\u200b"
         # add downtime field
-        if fiveMServer.get_downtime_seconds() > 60:
+        if server.get_downtime_seconds() > 60:
             embed.add_field(
                 name="**Offlinezeit:**",
-                value="`" + create_time_from_seconds(fiveMServer.get_downtime_seconds()) + "`",
+                value="`" + create_time_from_seconds(server.get_downtime_seconds()) + "`",
                 inline=False,
             )
         self.add_fivem_status_to_status_message(embed)
         return embed
 
+    def cfx_details(self) -> str:
+        """The unresolved incidents and the affected components from status.cfx.re as additional lines"""
+        details = ""
+        if self.cfx_incidents:
+            details += "\n**Vorfälle:**\n" + self.cfx_incidents
+        if self.cfx_components:
+            details += "\n**Betroffen:**\n" + self.cfx_components
+        return details
+
     @staticmethod
     def add_dot_to_fivem_status(status: str) -> str:
         """Adds a discord formatted colored dot depending on the status in front of the string"""
@@ -374,6 +893,360 @@ class Client(discord.Client):
             return status
 
 
+class Client(StatusDashboard, discord.Client):
+    router: dashboard.CommandRouter = None
+    """Dispatches the messages to the commands and the restart detection"""
+    chart_messages: dict = None
+    """The last uploaded chart message by server name"""
+
+    def __init__(self, *, loop=None, **options):
+        super().__init__(loop=loop, **options)
+        self.router = dashboard.CommandRouter()
+        self.chart_messages = {}
+        for restart_bot_id in MONITORED_SERVERS_BY_RESTART_BOT:
+            self.router.watch(restart_bot_id, self.on_fivem_bot_message)
+        self.router.command("toggleuptimevisibility", self.command_toggle_uptime_visibility, admin_only=True)
+        self.router.command("fivem", self.command_fivem)
+        self.router.command("stats", self.command_stats)
+        self.router.command("graph", self.command_graph)
+        self.router.command("togglecfxstatus", self.command_toggle_cfx_status, admin_only=True)
+        self.router.command("toggledowndetectorstatus", self.command_toggle_down_detector_status, admin_only=True)
+        for monitored in MONITORED_SERVERS:
+            if monitored.server.player_index is not None:
+                monitored.server.player_index.subscribe(functools.partial(self.log_players, monitored))
+        self.start_dashboard()
+
+    async def on_error(self, event_method, *args, **kwargs):
+        # the traceback is formatted on the logging thread
+        logging.error("unhandled error in " + str(event_method), exc_info=True)
+
+    async def on_ready(self):
+        print("Logged in as " + str(self.user.name) + " (" + str(self.user.id) + ")")
+        logging.info("Logged in as " + str(self.user.name) + " (" + str(self.user.id) + ")")
+        await asyncio.gather(*(
+            self.bind_status_target(target) for monitored in MONITORED_SERVERS for target in monitored.targets
+        ))
+
+    async def bind_status_target(self, target: StatusTarget):
+        """Gets the channel of the target and fetches its saved status message"""
+        target.channel = self.get_channel(target.channel_id)
+        if target.message is None:
+            # noinspection PyBroadException
+            try:
+                await self.rebind_status_message(target)
+            except Exception as e:
+                logging.warning("failed to rebind the status message " + target.key, exc_info=e)
+
+    async def on_message(self, message):
+        await self.router.dispatch(message)
+
+    async def on_fivem_bot_message(self, message):
+        """Handles the restart messages of the FiveM discord bots"""
+        if not message.author.bot:
+            return
+        delay = RESTART_MATCHER.search(message.content)
+        if delay is None:
+            return
+        for monitored in MONITORED_SERVERS_BY_RESTART_BOT[message.author.id]:
+            self.announce_restart(monitored, delay)
+
+    async def command_toggle_uptime_visibility(self, message, args: list):
+        if self.show_uptime:
+            self.show_uptime = False
+            await message.channel.send("Onlinezeit wird nicht mehr angezeigt :mute:")
+        else:
+            self.show_uptime = True
+            await message.channel.send("Onlinezeit wird wieder angezeigt :sound:")
+
+    async def command_fivem(self, message, args: list):
+        async with message.channel.typing():
+            embed = discord.Embed()
+            embed.set_author(
+                name="FiveM Status",
+                icon_url="https://fivem.net/favicon.png",
+                url="https://status.cfx.re/",
+            )
+            embed.set_footer(text="FlixRP", icon_url="https://verwaltung.flixrp.net/favicon-32x32.png")
+            embed.timestamp = datetime.utcnow()
+            embed.add_field(
+                name="\u200b",
+                value="**FiveM Status von [status.cfx.re](https://status.cfx.re/)**\n" +
+                      self.add_dot_to_fivem_status(self.cfx_status) + self.cfx_details(),
+                inline=True,
+            )
+            embed.add_field(
+                name="\u200b",
+                value="**FiveM Status von [Allestörungen.de](https://allestörungen.de/stoerung/fivem/)**\n" +
+                      self.add_dot_to_fivem_status(self.down_detector_status),
+                inline=True,
+            )
+            await message.channel.send(embed=embed)
+
+    async def command_toggle_cfx_status(self, message, args: list):
+        if self.show_cfx_status:
+            self.show_cfx_status = False
+            await message.channel.send("Der FiveM Status von `status.cfx.re` wird nicht mehr angezeigt :mute:")
+        else:
+            self.show_cfx_status = True
+            await message.channel.send("Der FiveM Status von `status.cfx.re` wird wieder angezeigt :sound:")
+
+    async def command_toggle_down_detector_status(self, message, args: list):
+        if self.show_down_detector_status:
+            self.show_down_detector_status = False
+            await message.channel.send("Der FiveM Status von `AlleStörungen.de` wird nicht mehr angezeigt :mute:")
+        else:
+            self.show_down_detector_status = True
+            await message.channel.send("Der FiveM Status von `AlleStörungen.de` wird wieder angezeigt :sound:")
+
+    async def close(self):
+        await self.stop_dashboard()
+        await super().close()
+
+    async def log_players(self, monitored: MonitoredServer, joined: list, left: list):
+        """Logs the players who joined or left the server in the player log channel"""
+        channel = self.get_channel(monitored.player_log_channel_id)
+        if channel is None:
+            return
+        lines = [":inbox_tray: **" + discord.utils.escape_markdown(player.name) + "** ist beigetreten"
+                 for player in joined]
+        for player in left:
+            line = ":outbox_tray: **" + discord.utils.escape_markdown(player.name) + "** hat den Server verlassen"
+            if player.get_session_seconds() > 60:
+                line += " (Spielzeit: " + create_time_from_seconds(player.get_session_seconds()) + ")"
+            lines.append(line)
+        content = ""
+        try:
+            for line in lines:
+                if len(content) + len(line) + 1 > 2000:
+                    await channel.send(content)
+                    content = ""
+                content += line + "\n"
+            if content:
+                await channel.send(content)
+        except Exception as e:
+            logging.warning("failed to log the players of " + monitored.server.name, exc_info=e)
+
+    async def command_graph(self, message, args: list):
+        """Sends the player and availability chart of the last 24 hours.
+        The argument is an optional server name"""
+        selected = [m for m in MONITORED_SERVERS if not args or m.server.name.lower() == args[0]]
+        if not selected:
+            await message.channel.send("Unbekannter Server. Beispiel: `!graph`")
+            return
+        files = []
+        for monitored in selected[:10]:
+            png = await self.loop.run_in_executor(None, monitored.chart.render)
+            files.append(discord.File(io.BytesIO(png), filename=self.chart_filename(monitored)))
+        await message.channel.send(
+            content="Spieler und Verfügbarkeit der letzten 24 Stunden von " +
+                    ", ".join("**" + m.display_name + "**" for m in selected[:10]),
+            files=files,
+        )
+
+    @staticmethod
+    def chart_filename(monitored: MonitoredServer) -> str:
+        return "chart-" + re.sub(r"[^A-Za-z0-9_-]", "_", monitored.server.name) + ".png"
+
+    def servers_updated(self, updated: List[MonitoredServer]):
+        super().servers_updated(updated)
+        if CHART_CHANNEL_ID:
+            for monitored in updated:
+                if monitored.server.name not in self.chart_messages or \
+                        monitored.chart.is_upload_due(CHART_UPDATE_INTERVAL):
+                    # remember the upload, so the next tick does not start it again
+                    self.chart_messages.setdefault(monitored.server.name, None)
+                    monitored.chart.uploaded_at = time()
+                    self.loop.create_task(self.upload_chart(monitored))
+
+    async def upload_chart(self, monitored: MonitoredServer):
+        """Uploads the chart of the server into the chart channel and shows it in the status message.
+        The status messages then reuse the URL of the upload until the chart is uploaded again"""
+        channel = self.get_channel(CHART_CHANNEL_ID)
+        if channel is None:
+            return
+        png = await self.loop.run_in_executor(None, monitored.chart.render)
+        try:
+            message = await channel.send(file=discord.File(io.BytesIO(png), filename=self.chart_filename(monitored)))
+        except discord.HTTPException as e:
+            logging.warning("failed to upload the chart of " + monitored.server.name + ": " + str(e))
+            return
+        monitored.chart.uploaded(message.attachments[0].url)
+        edits = monitored.publish(self.create_status(monitored))
+        if edits:
+            await asyncio.wait(edits, timeout=60)
+        # the status messages show the new chart now
+        previous = self.chart_messages.get(monitored.server.name)
+        if previous is None:
+            # the first upload after a restart replaces the chart uploaded before it
+            handle = dashboard.read_json(CHART_MESSAGES_FILE, {}).get(monitored.server.name)
+            if handle and handle.get("channel_id") == channel.id:
+                previous = channel.get_partial_message(handle["message_id"])
+        self.chart_messages[monitored.server.name] = message
+        self.save_chart_message(monitored, message)
+        if previous is not None:
+            try:
+                await previous.delete()
+            except discord.HTTPException:
+                pass
+
+    @staticmethod
+    def save_chart_message(monitored: MonitoredServer, message: discord.Message):
+        """Saves the IDs of the chart message, so it is deleted by the next upload after a restart"""
+        handles = dashboard.read_json(CHART_MESSAGES_FILE, {})
+        handles[monitored.server.name] = {
+            "channel_id": message.channel.id,
+            "message_id": message.id,
+        }
+        try:
+            dashboard.write_json_atomic(CHART_MESSAGES_FILE, handles)
+        except OSError as e:
+            logging.error("failed to save the chart message", exc_info=e)
+
+    async def command_stats(self, message, args: list):
+        """Sends the statistics of the monitored servers over a time window.
+        The arguments are an optional window like ``24h`` and an optional server name"""
+        window = Intervals.DAY
+        selected = MONITORED_SERVERS
+        for arg in args:
+            if parse_duration(arg):
+                window = parse_duration(arg)
+            else:
+                selected = [m for m in MONITORED_SERVERS if m.server.name.lower() == arg]
+                if not selected:
+                    await message.channel.send("Unbekannter Server oder Zeitraum. Beispiel: `!stats 24h`")
+                    return
+        now = time()
+        embed = discord.Embed()
+        embed.title = "Statistik der letzten " + create_time_from_seconds(window)
+        embed.colour = 0x3498DB
+        embed.timestamp = datetime.utcnow()
+        for monitored in selected[:25]:
+            stats = monitored.history.stats(now - window, now)
+            if not stats.samples:
+                value = "Keine Daten"
+            else:
+                value = "Verfügbarkeit: `{:.2f} %`\nSpieler: `Ø {:.1f} / Spitze {}`".format(
+                    stats.availability * 100, stats.average_players, stats.peak_players)
+                if stats.latency_percentiles:
+                    value += "\nPing: `" + " / ".join(
+                        "p" + str(p) + " " + str(int(latency)) + " ms" for p, latency in stats.latency_percentiles.items()
+                    ) + "`"
+            embed.add_field(name="**" + monitored.display_name + ":**", value=value, inline=False)
+        await message.channel.send(embed=embed)
+
+    def is_status_message_of(self, message: discord.Message, monitored: MonitoredServer) -> bool:
+        """Check whether the message is the status message of the given server"""
+        return message.author.id == self.user.id and bool(message.embeds) \
+            and message.embeds[0].author.name == monitored.title
+
+    async def edit_status_message(self, monitored: MonitoredServer, target: StatusTarget, embed) -> bool:
+        """Edits the status message of the server in the target channel.
+        Use the :class:`dashboard.StatusEditor` of the target instead of calling this directly.
+
+        :return: Whether the status message shows the embed afterwards
+        :rtype: bool
+
+        :raises discord.HTTPException: When discord rate limited the request
+        """
+        with Metrics.EDIT_STATUS_MESSAGE.time(server=monitored.server.name, channel=str(target.channel_id)):
+            # noinspection PyBroadException
+            try:
+                if target.message is None and not await self.rebind_status_message(target):
+                    return await self.recover_status_message(monitored, target, embed)
+                await target.message.edit(embed=embed, content=None, suppress=False)
+                return True
+            except discord.NotFound:
+                # the status message was deleted
+                target.message = None
+                return await self.recover_status_message(monitored, target, embed)
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    raise
+                logging.warning("skipped status update " + target.key + ": " + str(e))
+            except Exception as e:
+                logging.warning("skipped status update " + target.key, exc_info=e)
+            Metrics.SKIPPED_UPDATES.inc(server=monitored.server.name)
+            return False
+
+    async def rebind_status_message(self, target: StatusTarget) -> bool:
+        """Fetches the status message whose IDs were saved before the last restart.
+
+        :return: Whether the status message was found. False when it is unknown or was deleted
+        :rtype: bool
+        """
+        handle = dashboard.read_json(STATUS_MESSAGES_FILE, {}).get(target.key)
+        if not handle or target.channel is None or handle.get("channel_id") != target.channel.id:
+            return False
+        try:
+            target.message = await target.channel.fetch_message(handle["message_id"])
+            # the saved message may show anything, the next embed is sent in any case
+            target.editor.invalidate()
+            logging.info("rebound status message " + target.key)
+            return True
+        except discord.NotFound:
+            return False
+
+    @staticmethod
+    def save_status_message(target: StatusTarget):
+        """Saves the IDs of the status message, so it is found again after a restart"""
+        handles = dashboard.read_json(STATUS_MESSAGES_FILE, {})
+        handles[target.key] = {
+            "channel_id": target.message.channel.id,
+            "message_id": target.message.id,
+        }
+        try:
+            dashboard.write_json_atomic(STATUS_MESSAGES_FILE, handles)
+        except OSError as e:
+            logging.error("failed to save the status message", exc_info=e)
+
+    async def recover_status_message(self, monitored: MonitoredServer, target: StatusTarget, embed) -> bool:
+        """Called when the status message does not exist.
+        Reuses a message from the history or resends the status message
+
+        :return: Whether the status message shows the embed afterwards
+        :rtype: bool
+        """
+        # the last sent embed is gone with the old message. Until a new one shows the embed, nothing is skipped
+        target.editor.invalidate()
+        if target.channel is None:
+            target.channel = self.get_channel(target.channel_id)
+            if target.channel is None:
+                return False
+        # try to get a message from the channel history before resending the hole status message
+        try:
+            async for message in target.channel.history(limit=10):
+                if message.author.bot and self.is_status_message_of(message, monitored):
+                    await message.edit(embed=embed, content=None, suppress=False)
+                    target.message = message
+                    self.save_status_message(target)
+                    logging.info("reused status message " + target.key + " from history")
+                    Metrics.HISTORY_REUSES.inc(server=monitored.server.name)
+                    return True
+        except Exception as e:
+            logging.error("failed to edit message from history", exc_info=e)
+        # resend the status message. Only the own status channel is cleaned up before,
+        # the mirror channels belong to other communities. Keep the status messages of the other servers
+        if not target.mirror:
+            others = [m for m in MONITORED_SERVERS if m is not monitored]
+            Metrics.CHANNEL_PURGES.inc(server=monitored.server.name)
+            try:
+                await target.channel.purge(
+                    bulk=True,
+                    check=lambda msg: not any(self.is_status_message_of(msg, other) for other in others),
+                )
+            except Exception as e:
+                logging.error("cannot clean up status channel", exc_info=e)
+                return False
+        try:
+            target.message = await target.channel.send(embed=embed)
+            self.save_status_message(target)
+            logging.info("re sent status message " + target.key)
+            return True
+        except Exception as e:
+            logging.error("failed to send the status message.", exc_info=e)
+            return False
+
+
 if __name__ == "__main__":
     client = Client(
         allowed_mentions=discord.AllowedMentions.none(),
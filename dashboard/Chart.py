@@ -0,0 +1,97 @@
+from time import time
+from typing import List, Optional, Tuple
+
+from .Png import encode_png
+
+PALETTE = (
+    (0x2F, 0x31, 0x36),  # background
+    (0x40, 0x44, 0x4B),  # grid
+    (0x34, 0x98, 0xDB),  # players
+    (0x74, 0xEE, 0x15),  # online
+    (0xFF, 0xAC, 0x00),  # partially online
+    (0xFF, 0x00, 0x00),  # offline
+    (0x4F, 0x54, 0x5C),  # no data
+)
+"""The colors of the chart, matching the colors of the status messages"""
+_BACKGROUND, _GRID, _PLAYERS, _ONLINE, _PARTIAL, _OFFLINE, _NO_DATA = range(len(PALETTE))
+
+
+def render_trend_chart(buckets: List[Optional[Tuple[int, float]]], max_players: Optional[int] = None,
+                       width: int = 480, height: int = 100, strip: int = 6) -> bytes:
+    """Render the player amount as area and the availability as colored strip below it
+
+    :param buckets: The peak players and the availability per time slot, from the oldest to the newest.
+        None for slots without data. See :func:`fivem.MinuteRollup.buckets`
+    :type buckets: List[Optional[Tuple[int, float]]]
+    :param max_players: The top of the player scale. Defaults to the peak players
+    :type max_players: Optional[int]
+    :param width: The width in pixels. The buckets are merged into this many columns
+    :type width: int
+    :param height: The height of the player area in pixels
+    :type height: int
+    :param strip: The height of the availability strip in pixels
+    :type strip: int
+    :return: The chart as PNG
+    :rtype: bytes
+    """
+    bars = bytearray(width)
+    colors = bytearray([_NO_DATA]) * width
+    peaks = []
+    availabilities = []
+    for x in range(width):
+        # the peak and the worst availability of all buckets in this column
+        column = [bucket for bucket in buckets[x * len(buckets) // width:(x + 1) * len(buckets) // width] if bucket]
+        peaks.append(max((bucket[0] for bucket in column), default=0))
+        availabilities.append(min((bucket[1] for bucket in column), default=None))
+    scale = max(max_players or 0, max(peaks, default=0), 1)
+    for x in range(width):
+        bars[x] = min(height, round(peaks[x] / scale * height))
+        if availabilities[x] is not None:
+            colors[x] = _ONLINE if availabilities[x] >= 1 else _OFFLINE if availabilities[x] <= 0 else _PARTIAL
+    grid = {height // 4, height // 2, height * 3 // 4}
+    rows = []
+    for y in range(height):
+        level = height - y
+        base = _GRID if y in grid else _BACKGROUND
+        rows.append(bytes(_PLAYERS if bar >= level else base for bar in bars))
+    rows.append(bytes(width))
+    rows += [bytes(colors)] * strip
+    return encode_png(width, len(rows), PALETTE, rows)
+
+
+class TrendChart:
+    """The player and availability chart of a server, rendered from a :class:`fivem.MinuteRollup`.
+    The image is only rendered again when a bucket of the rollup changed, and remembers where it was uploaded."""
+
+    def __init__(self, rollup, max_players: Optional[int] = None):
+        self.rollup = rollup
+        """The rollup of the requested states"""
+        self.max_players: Optional[int] = max_players
+        """The top of the player scale"""
+        self.url: Optional[str] = None
+        """The URL of the uploaded chart, to show it without uploading it again"""
+        self.uploaded_at: float = 0.0
+        """When the chart was uploaded the last time"""
+        self._uploaded_version: int = -1
+        """The version of the rollup when the chart was uploaded the last time"""
+        self._version: int = -1
+        """The version of the rollup the cached image was rendered from"""
+        self._png: bytes = b""
+        """The cached image"""
+
+    def render(self) -> bytes:
+        """Get the chart as PNG. Rendered again only when the rollup changed"""
+        if self._version != self.rollup.version:
+            self._version = self.rollup.version
+            self._png = render_trend_chart(self.rollup.buckets(time()), self.max_players)
+        return self._png
+
+    def is_upload_due(self, interval: float) -> bool:
+        """Check whether the rollup changed since the last upload and the last upload is older than the interval"""
+        return self.rollup.version != self._uploaded_version and time() - self.uploaded_at >= interval
+
+    def uploaded(self, url: str):
+        """Remember the URL of the uploaded chart"""
+        self.url = url
+        self.uploaded_at = time()
+        self._uploaded_version = self._version
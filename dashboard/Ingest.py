@@ -0,0 +1,56 @@
+import hmac
+import json
+import logging
+from typing import Callable
+
+from aiohttp import web
+
+SECRET_HEADER = "X-Dashboard-Secret"
+"""The header which must contain the shared secret"""
+
+
+async def start_ingest_server(host: str, port: int, secret: str, handler: Callable[[dict], None],
+                              max_body: int = 65536) -> web.AppRunner:
+    """Accept events as JSON object, or list of JSON objects, on ``POST http://host:port/events``.
+    Every request must contain the shared secret in the ``X-Dashboard-Secret`` header.
+
+    :param secret: The shared secret. Must not be empty
+    :type secret: str
+    :param handler: Called with every event. Raises a ValueError, KeyError or TypeError when the event is invalid
+    :type handler: Callable[[dict], None]
+    :param max_body: The maximum size of a request in bytes
+    :type max_body: int
+    :return: The runner of the server. Call its ``cleanup()`` to stop it
+    :rtype: web.AppRunner
+
+    :raises ValueError: When the secret is empty
+    """
+    if not secret:
+        raise ValueError("the ingest endpoint needs a secret")
+    expected = secret.encode("utf-8")
+
+    async def handle(request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, "").encode("utf-8"), expected):
+            return web.Response(status=401, text="invalid secret")
+        try:
+            events = json.loads(await request.read())
+        except ValueError:
+            return web.Response(status=400, text="invalid json")
+        if not isinstance(events, list):
+            events = [events]
+        for event in events:
+            try:
+                if not isinstance(event, dict):
+                    raise TypeError("an event must be an object")
+                handler(event)
+            except (ValueError, KeyError, TypeError) as e:
+                logging.warning("rejected event " + str(event)[:200] + ": " + str(e))
+                return web.Response(status=400, text="invalid event: " + str(e))
+        return web.Response(status=204)
+
+    app = web.Application(client_max_size=max_body)
+    app.router.add_post("/events", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
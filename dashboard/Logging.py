@@ -0,0 +1,121 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from time import monotonic, time
+from typing import Dict, Tuple
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets only a burst of records from the same line of code through per period, e.g. during an outage.
+    The amount of suppressed records is appended to the next record of that line which passes again.
+    Errors are never suppressed by default, because many unrelated ones are logged from the same line,
+    e.g. every unhandled exception by ``on_error``."""
+
+    def __init__(self, burst: int = 5, period: float = 60, max_level: int = logging.WARNING):
+        super().__init__()
+        self.burst: int = burst
+        """How many records of the same line pass per period"""
+        self.period: float = period
+        """The length of a period in seconds"""
+        self.max_level: int = max_level
+        """Records above this level are never suppressed"""
+        self._windows: Dict[Tuple[str, int], list] = {}
+        """The start of the current period, the passed and the suppressed records by line of code"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        key = (record.pathname, record.lineno)
+        now = monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.period:
+            suppressed = window[2] if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = str(record.msg) + " (" + str(suppressed) + " similar messages suppressed)"
+            return True
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotates the log file when it exceeds a size or is older than an interval.
+    The current file is continued after a restart, so the history is kept."""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, interval: float):
+        super().__init__(filename, mode="a", maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=False)
+        self.interval: float = interval
+        """The seconds after which the file is rotated, regardless of its size. 0 to rotate only by size"""
+        try:
+            opened_at = os.path.getmtime(filename) if os.path.getsize(filename) else time()
+        except OSError:
+            opened_at = time()
+        self.rollover_at: float = opened_at + interval
+        """The timestamp when the file is rotated the next time"""
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time() + self.interval
+
+
+class InProcessQueueHandler(logging.handlers.QueueHandler):
+    """Puts the records unformatted into the queue.
+    The queue never leaves the process, so formatting, including the tracebacks, is left to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(path: str, level: int = logging.INFO, max_bytes: int = 5 * 2 ** 20, backup_count: int = 7,
+                  interval: float = 86400, burst: int = 5, period: float = 60) -> logging.handlers.QueueListener:
+    """Log into a rotating file. The records are formatted and written on a background thread,
+    so logging never blocks the event loop. Repeated warnings of the same line of code are rate limited.
+
+    :param path: The log file
+    :type path: str
+    :param level: The minimum level of the logged records
+    :type level: int
+    :param max_bytes: The size in bytes at which the file is rotated
+    :type max_bytes: int
+    :param backup_count: How many rotated files are kept
+    :type backup_count: int
+    :param interval: The seconds after which the file is rotated regardless of its size. 0 to disable
+    :type interval: float
+    :param burst: How many records of the same line of code are logged per period. 0 to disable the limit
+    :type burst: int
+    :param period: The length of a rate limit period in seconds
+    :type period: float
+    :return: The listener which writes the records. It is stopped at exit
+    :rtype: logging.handlers.QueueListener
+    """
+    file_handler = SizeAndTimeRotatingFileHandler(path, max_bytes, backup_count, interval)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s:%(levelname)s:%(message)s"))
+    records = queue.SimpleQueue()
+    queue_handler = InProcessQueueHandler(records)
+    if burst > 0:
+        queue_handler.addFilter(RateLimitFilter(burst, period))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener: logging.handlers.QueueListener):
+    """Writes the remaining records at exit, unless the listener was already stopped"""
+    # stopping twice fails before python 3.12
+    if listener._thread is not None:
+        listener.stop()
@@ -0,0 +1,178 @@
+import asyncio
+import bisect
+from time import monotonic, perf_counter
+from typing import Dict, List, Sequence, Tuple
+
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+"""The default upper bounds of the histogram buckets in seconds"""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [name + '="' + _escape(value) + '"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(extra[0] + '="' + extra[1] + '"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """A metric in the Prometheus text format, with one value per combination of label values"""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), registry: "Registry" = None):
+        self.name: str = name
+        """The metric name"""
+        self.documentation: str = documentation
+        """The help text of the metric"""
+        self.label_names: Tuple[str, ...] = tuple(labels)
+        """The names of the labels"""
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        """Get the lines of the metric in the Prometheus text format"""
+        return ["# HELP " + self.name + " " + self.documentation, "# TYPE " + self.name + " " + self.type]
+
+
+class Counter(Metric):
+    """A value which only goes up"""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), registry: "Registry" = None):
+        super().__init__(name, documentation, labels, registry)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in self._values.items():
+            lines.append(self.name + _format_labels(self.label_names, key) + " " + _format_value(value))
+        return lines
+
+
+class Gauge(Counter):
+    """A value which can go up and down"""
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+
+class _Timer:
+    """Observes the duration of a with-block in a histogram"""
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._histogram.observe(perf_counter() - self._started, **self._labels)
+        return False
+
+
+class Histogram(Metric):
+    """Counts the observed values in buckets"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), registry: "Registry" = None,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels, registry)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets)) + (float("inf"),)
+        """The upper bounds of the buckets"""
+        self._values: Dict[Tuple[str, ...], list] = {}
+        """The counts per bucket, the sum and the count by the label values"""
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        values = self._values.get(key)
+        if values is None:
+            values = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        values[0][bisect.bisect_left(self.buckets, value)] += 1
+        values[1] += value
+        values[2] += 1
+
+    def time(self, **labels) -> _Timer:
+        """Observe the duration of a with-block"""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (counts, total, count) in self._values.items():
+            cumulated = 0
+            for bound, amount in zip(self.buckets, counts):
+                cumulated += amount
+                lines.append(self.name + "_bucket" + _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                             + " " + str(cumulated))
+            lines.append(self.name + "_sum" + _format_labels(self.label_names, key) + " " + _format_value(total))
+            lines.append(self.name + "_count" + _format_labels(self.label_names, key) + " " + str(count))
+        return lines
+
+
+class Registry:
+    """A collection of metrics which are exposed together"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric):
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        """Get all metrics in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+"""The default registry"""
+
+
+async def monitor_loop_lag(gauge: Gauge, interval: float = 0.5):
+    """Measures how much later than requested the event loop wakes up and sets it in the gauge in seconds"""
+    while True:
+        started = monotonic()
+        await asyncio.sleep(interval)
+        gauge.set(max(monotonic() - started - interval, 0))
+
+
+async def start_metrics_server(host: str, port: int, registry: Registry = None) -> web.AppRunner:
+    """Serve the metrics on ``http://host:port/metrics``
+
+    :return: The runner of the server. Call its ``cleanup()`` to stop it
+    :rtype: web.AppRunner
+    """
+    registry = registry if registry is not None else REGISTRY
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,43 @@
+import json
+import logging
+import os
+import tempfile
+
+
+def write_json_atomic(path: str, data):
+    """Write the data as JSON, so that the file contains either the old or the new data, even on a crash.
+    The data is written to a temporary file in the same directory, synced to the disk and renamed.
+
+    :param path: The file to write
+    :type path: str
+    :param data: The JSON serializable data
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path: str, default=None):
+    """Read a JSON file
+
+    :return: The data or the default, when the file does not exist or is broken
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logging.warning("failed to read " + path, exc_info=e)
+        return default
@@ -0,0 +1,39 @@
+import struct
+import zlib
+from typing import List, Sequence, Tuple
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    """Create a PNG chunk with its length and checksum"""
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(width: int, height: int, palette: Sequence[Tuple[int, int, int]], rows: List[bytes]) -> bytes:
+    """Encode an image with up to 256 colors as PNG, without any image library
+
+    :param width: The width in pixels
+    :type width: int
+    :param height: The height in pixels
+    :type height: int
+    :param palette: The RGB colors of the image
+    :type palette: Sequence[Tuple[int, int, int]]
+    :param rows: The rows from top to bottom. Every row has one byte per pixel, the index of its color in the palette
+    :type rows: List[bytes]
+    :return: The PNG file
+    :rtype: bytes
+
+    :raises ValueError: When the rows do not match the size or there are too many colors
+    """
+    if len(rows) != height or any(len(row) != width for row in rows):
+        raise ValueError("the rows do not match the size of the image")
+    if not 0 < len(palette) <= 256:
+        raise ValueError("the palette must have 1 to 256 colors")
+    # every row starts with the filter type 0 (none)
+    raw = b"".join(b"\x00" + bytes(row) for row in rows)
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+        _chunk(b"PLTE", b"".join(bytes(color) for color in palette)),
+        _chunk(b"IDAT", zlib.compress(raw, 9)),
+        _chunk(b"IEND", b""),
+    ))
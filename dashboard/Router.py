@@ -0,0 +1,104 @@
+import re
+from typing import Awaitable, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+Handler = Callable[..., Awaitable[None]]
+
+
+class PhraseMatcher(Generic[T]):
+    """Searches a text for many phrases at once with one precompiled, case-insensitive regular expression.
+    When several phrases occur, the value of the phrase which was added first wins."""
+
+    def __init__(self, phrases: Iterable[Tuple[str, T]] = ()):
+        self._phrases: List[Tuple[str, T]] = []
+        self._pattern: Optional[re.Pattern] = None
+        for phrase, value in phrases:
+            self.add(phrase, value)
+
+    def add(self, phrase: str, value: T):
+        """Add a phrase. Empty phrases are ignored"""
+        if phrase.strip():
+            self._phrases.append((phrase.strip(), value))
+            # the lookahead matches with zero width, so overlapping phrases are all found
+            self._pattern = re.compile(
+                "(?=" + "|".join(
+                    "(?P<p" + str(i) + ">" + re.escape(p) + ")" for i, (p, _) in enumerate(self._phrases)
+                ) + ")",
+                re.IGNORECASE,
+            )
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+    def search(self, text: str) -> Optional[T]:
+        """Get the value of the phrase in the text
+
+        :return: The value of the phrase with the highest priority in the text or None
+        """
+        if self._pattern is None:
+            return None
+        best = None
+        for match in self._pattern.finditer(text):
+            index = int(match.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if index == 0:
+                    break
+        return self._phrases[best][1] if best is not None else None
+
+
+class CommandRouter:
+    """Dispatches messages to the handlers of commands and watched authors.
+    Messages from not watched authors which do not start with the prefix are rejected
+    without any further string work."""
+
+    def __init__(self, prefix: str = "!"):
+        self.prefix: str = prefix
+        """The prefix of the commands"""
+        self._commands: Dict[str, Tuple[Handler, bool]] = {}
+        """The handlers and whether they are only for administrators by command name"""
+        self._watched: Dict[int, Handler] = {}
+        """The handlers for all messages of an author by the author ID"""
+
+    def command(self, name: str, handler: Handler, admin_only: bool = False):
+        """Register a command. The handler is called with the message and the arguments after the command name
+
+        :param name: The command name without the prefix
+        :type name: str
+        :param handler: The coroutine function to handle the command
+        :param admin_only: Whether only server administrators can use the command
+        :type admin_only: bool
+        """
+        self._commands[name.lower()] = (handler, admin_only)
+
+    def watch(self, author_id: int, handler: Handler):
+        """Call the handler with every message of the author"""
+        self._watched[author_id] = handler
+
+    async def dispatch(self, message) -> bool:
+        """Call the handler matching the message
+
+        :return: Whether a handler was called
+        :rtype: bool
+        """
+        watcher = self._watched.get(message.author.id)
+        if watcher is not None:
+            await watcher(message)
+            return True
+        content = message.content
+        if not content.startswith(self.prefix):
+            return False
+        parts = content[len(self.prefix):].split()
+        if not parts:
+            return False
+        command = self._commands.get(parts[0].lower())
+        if command is None:
+            return False
+        handler, admin_only = command
+        if admin_only:
+            # authors of webhook messages and users who left the guild are no members and have no permissions
+            permissions = getattr(message.author, "guild_permissions", None)
+            if permissions is None or not permissions.administrator:
+                return False
+        await handler(message, [arg.lower() for arg in parts[1:]])
+        return True
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+import logging
+from time import monotonic
+from typing import Awaitable, Callable, List, Optional
+
+import discord
+
+
+class StatusEditor:
+    """Sends the edits of one status message.
+
+    Only one edit is in flight at a time. Embeds which are submitted meanwhile replace each other,
+    so only the latest one is sent afterwards. Embeds whose content equals the last sent one are skipped.
+    """
+
+    def __init__(self, send: Callable[[discord.Embed], Awaitable[bool]], refresh_interval: float = 300):
+        self._send = send
+        """Sends the embed. Returns whether the status message shows the embed afterwards"""
+        self.refresh_interval: float = refresh_interval
+        """After this amount of seconds an embed is sent even if its content did not change"""
+        self._pending: Optional[discord.Embed] = None
+        """The latest submitted embed that is not sent yet"""
+        self._waiters: List[asyncio.Future] = []
+        """The futures of the callers waiting for the pending embed"""
+        self._task: Optional[asyncio.Task] = None
+        """The task which is currently sending the edits"""
+        self._fingerprint: Optional[bytes] = None
+        """The fingerprint of the last sent embed"""
+        self._sent_at: float = 0.0
+        """The monotonic time when the last embed was sent"""
+        self._blocked_until: float = 0.0
+        """The monotonic time until which discord asked not to send further requests"""
+        self.skipped_edits: int = 0
+        """How many edits were skipped because the content did not change or a newer embed replaced them"""
+
+    @staticmethod
+    def fingerprint(embed: discord.Embed) -> bytes:
+        """Creates a hash of the embed content. The timestamp is ignored"""
+        data = embed.to_dict()
+        data.pop("timestamp", None)
+        return hashlib.blake2b(json.dumps(data, sort_keys=True).encode("utf-8"), digest_size=16).digest()
+
+    def submit(self, embed: discord.Embed) -> asyncio.Future:
+        """Schedules the embed to be sent. A still pending embed is replaced by this one.
+
+        :return: A future which is done when this embed or a newer one was handled
+        :rtype: asyncio.Future
+        """
+        if self._pending is not None:
+            self.skipped_edits += 1
+        self._pending = embed
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return waiter
+
+    def invalidate(self):
+        """Forget the last sent embed, so the next one is sent in any case"""
+        self._fingerprint = None
+
+    async def _run(self):
+        """Sends the pending embeds until there is no one left"""
+        while self._pending is not None:
+            wait = self._blocked_until - monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            embed = self._pending
+            waiters = self._waiters
+            self._pending = None
+            self._waiters = []
+            try:
+                fingerprint = self.fingerprint(embed)
+                if fingerprint == self._fingerprint and monotonic() - self._sent_at < self.refresh_interval:
+                    self.skipped_edits += 1
+                    continue
+                try:
+                    if await self._send(embed):
+                        self._fingerprint = fingerprint
+                        self._sent_at = monotonic()
+                except discord.HTTPException as e:
+                    if e.status != 429:
+                        raise
+                    self._rate_limited(e)
+                    if self._pending is None:  # retry with this embed, unless a newer one arrived
+                        self._pending = embed
+                        self._waiters = waiters
+                        waiters = []
+            except Exception as e:
+                logging.error("failed to send the status message edit", exc_info=e)
+            finally:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    def _rate_limited(self, error: discord.HTTPException):
+        """Blocks the edits for the time discord asked for"""
+        retry_after = 1.0
+        # noinspection PyBroadException
+        try:
+            retry_after = float(error.response.headers.get("Retry-After", retry_after))
+        except Exception:
+            pass
+        self._blocked_until = monotonic() + retry_after
+        logging.warning("status message edits are rate limited for " + str(retry_after) + " seconds")
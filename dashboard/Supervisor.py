@@ -0,0 +1,103 @@
+import asyncio
+import json
+import logging
+from time import monotonic
+from typing import Callable, Dict, List, Optional
+
+
+class WorkerSupervisor:
+    """Runs a worker process and restarts it whenever it exits.
+
+    The messages are exchanged as JSON lines: the worker writes them to its stdout
+    and reads the messages of the supervisor from its stdin.
+    """
+
+    def __init__(self, args: List[str], handler: Callable[[dict], None], env: Dict[str, str] = None,
+                 min_backoff: float = 1, max_backoff: float = 60):
+        self.args: List[str] = args
+        """The command line which starts the worker"""
+        self._handler: Callable[[dict], None] = handler
+        """Called with every message of the worker"""
+        self.env: Optional[Dict[str, str]] = env
+        """The environment variables of the worker. None to inherit the ones of this process"""
+        self.min_backoff: float = min_backoff
+        """The seconds to wait before the first restart after a crash"""
+        self.max_backoff: float = max_backoff
+        """The seconds to wait at most between two restarts. The wait doubles with every crash in a row"""
+        self.process: Optional[asyncio.subprocess.Process] = None
+        """The running worker process"""
+        self.restarts: int = 0
+        """How often the worker was restarted"""
+        self._stopped: bool = False
+        """Whether :func:`stop` was called"""
+
+    async def run(self):
+        """Starts the worker and restarts it until :func:`stop` is called"""
+        backoff = self.min_backoff
+        while not self._stopped:
+            started_at = monotonic()
+            try:
+                self.process = await asyncio.create_subprocess_exec(
+                    *self.args,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    env=self.env,
+                    limit=2 ** 20,
+                )
+            except OSError as e:
+                logging.error("failed to start the worker", exc_info=e)
+            else:
+                logging.info("started the worker " + str(self.process.pid))
+                await self._read(self.process)
+                code = await self.process.wait()
+                if self._stopped:
+                    return
+                logging.error("the worker exited with code " + str(code))
+            # a worker which ran for a while is restarted quickly again
+            if monotonic() - started_at > self.max_backoff:
+                backoff = self.min_backoff
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+            self.restarts += 1
+
+    async def _read(self, process: asyncio.subprocess.Process):
+        """Passes the messages of the worker to the handler until its stdout is closed"""
+        async for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logging.warning("invalid message from the worker: " + line[:200].decode("utf-8", "replace"))
+                continue
+            # noinspection PyBroadException
+            try:
+                self._handler(message)
+            except Exception as e:
+                logging.error("failed to handle a message of the worker", exc_info=e)
+
+    def send(self, message: dict) -> bool:
+        """Sends a message to the worker
+
+        :return: Whether the worker is running. Messages to a stopped worker are dropped
+        :rtype: bool
+        """
+        process = self.process
+        if process is None or process.returncode is not None or process.stdin is None:
+            return False
+        try:
+            process.stdin.write(json.dumps(message).encode("utf-8") + b"\n")
+        except (ConnectionError, RuntimeError):
+            return False
+        return True
+
+    async def stop(self, timeout: float = 5):
+        """Stops the worker without restarting it. It is killed when it does not exit within the timeout"""
+        self._stopped = True
+        process = self.process
+        if process is None or process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
@@ -0,0 +1,9 @@
+from .Chart import TrendChart, render_trend_chart
+from .Ingest import start_ingest_server
+from .Logging import RateLimitFilter, setup_logging
+from .Metrics import Counter, Gauge, Histogram, Registry, monitor_loop_lag, start_metrics_server
+from .Persistence import read_json, write_json_atomic
+from .Png import encode_png
+from .Router import CommandRouter, PhraseMatcher
+from .StatusEditor import StatusEditor
+from .Supervisor import WorkerSupervisor
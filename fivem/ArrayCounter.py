@@ -0,0 +1,104 @@
+import re
+from typing import Optional
+
+_STRUCTURE = b'"[]{},'
+"""The only bytes which matter for counting, once the escapes are resolved"""
+_NOT_STRUCTURE = bytes(b for b in range(256) if b not in _STRUCTURE)
+_NOT_ESCAPE = bytes(b for b in range(256) if b not in _STRUCTURE + b'\\/bfnrtu')
+"""Everything except the structure, the backslashes and the characters which can follow a backslash"""
+_WHITESPACE = b" \t\r\n"
+_EMPTY_GROUP = re.compile(rb"\[,*\]|\{,*\}")
+"""A nested array or object without strings and without complete children, only its commas are left"""
+
+
+class ArrayCounter:
+    """Incremental counter of the elements of a top-level JSON array, e.g. the players.json of a FiveM server.
+    Feed it chunk by chunk and stop reading when :attr:`done` is set.
+
+    No Python objects are built for the elements. Every chunk is reduced with bytes operations to its brackets and
+    commas, the strings are dropped and complete nested arrays and objects are removed, so only the few remaining
+    brackets and the commas between the elements are looked at one by one.
+    """
+
+    def __init__(self):
+        self.done: bool = False
+        """Whether the array was read completely"""
+        self._depth: int = 0
+        """The nesting depth at the end of the fed chunks. 1 inside the top-level array"""
+        self._commas: int = 0
+        """The commas between the elements of the top-level array"""
+        self._empty: Optional[bool] = None
+        """Whether the array has no elements. None until the first byte after its opening bracket was fed"""
+        self._in_string: bool = False
+        """Whether the fed chunks end inside a string"""
+        self._carry: bytes = b""
+        """The backslashes at the end of the last chunk, which escape the first byte of the next one"""
+
+    @property
+    def count(self) -> Optional[int]:
+        """The amount of elements, or None when the array was not read completely yet"""
+        if not self.done:
+            return None
+        return 0 if self._empty else self._commas + 1
+
+    def feed_bytes(self, chunk: bytes) -> bool:
+        """Feed the next chunk of the JSON
+
+        :return: Whether the array was read completely
+        :rtype: bool
+
+        :raises ValueError: When the JSON is not an array
+        """
+        if self.done:
+            return True
+        if self._carry:
+            chunk = self._carry + chunk
+        stripped = chunk.rstrip(b"\\")
+        self._carry = chunk[len(stripped):]
+        chunk = stripped
+        if not self._depth:
+            chunk = chunk.lstrip(_WHITESPACE)
+            if not chunk:
+                return False
+            if chunk[:1] != b"[":
+                raise ValueError("the JSON is not an array")
+            self._depth = 1
+            chunk = chunk[1:]
+        if self._empty is None:
+            rest = chunk.lstrip(_WHITESPACE)
+            if not rest:
+                return False
+            self._empty = rest[:1] == b"]"
+        if b"\\" in chunk:
+            # drop escaped backslashes and quotes, so every quote left starts or ends a string
+            chunk = chunk.translate(None, _NOT_ESCAPE).replace(b"\\\\", b"").replace(b'\\"', b"")
+        chunk = chunk.translate(None, _NOT_STRUCTURE)
+        if self._in_string:
+            end = chunk.find(b'"')
+            if end < 0:
+                return False
+            chunk = chunk[end + 1:]
+            self._in_string = False
+        if chunk.count(b'"') % 2:
+            # the last string continues in the next chunk
+            self._in_string = True
+            chunk = chunk[:chunk.rfind(b'"')]
+        if b'"' in chunk:
+            # usually all strings are empty now, only names with brackets or commas need the split
+            structure = chunk.replace(b'""', b"")
+            chunk = b"".join(chunk.split(b'"')[::2]) if b'"' in structure else structure
+        removed = 1
+        while removed:
+            chunk, removed = _EMPTY_GROUP.subn(b"", chunk)
+        for char in chunk:
+            if char == 44:  # ,
+                if self._depth == 1:
+                    self._commas += 1
+            elif char == 91 or char == 123:  # [ {
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if not self._depth:
+                    self.done = True
+                    break
+        return self.done
@@ -0,0 +1,120 @@
+from time import time
+from typing import Dict, Mapping, Optional
+
+
+class CacheEntry:
+    """A cached value of an upstream resource together with its validators"""
+
+    def __init__(self, value: str, etag: Optional[str], last_modified: Optional[str]):
+        self.value: str = value
+        """The cached value"""
+        self.etag: Optional[str] = etag
+        """The ETag header of the response the value was parsed from"""
+        self.last_modified: Optional[str] = last_modified
+        """The Last-Modified header of the response the value was parsed from"""
+        self.fetched_at: float = time()
+        """The timestamp when the value was fetched or revalidated the last time"""
+        self.changed_at: float = self.fetched_at
+        """The timestamp when the value changed the last time"""
+
+    def age(self) -> float:
+        """The seconds since the value was fetched or revalidated"""
+        return time() - self.fetched_at
+
+
+class UpstreamCache:
+    """Caches the values of upstream resources like the cfx.re status.
+
+    A value is fresh for ``ttl`` seconds. After that it is stale and should be revalidated,
+    but it is still served for ``stale_ttl`` more seconds, even when the revalidation fails.
+    """
+
+    def __init__(self, ttl: float = 30, stale_ttl: float = 600):
+        self.ttl: float = ttl
+        """How many seconds a value is fresh"""
+        self.stale_ttl: float = stale_ttl
+        """How many seconds a value is still served after it became stale"""
+        self._entries: Dict[str, CacheEntry] = {}
+        """The cached entries by their key"""
+        self._errors: Dict[str, str] = {}
+        """The error message of the last failed revalidation by key"""
+
+    def get(self, key: str, default: str = "") -> str:
+        """Get the cached value. When there is no usable value, the error of the last failed fetch is returned.
+
+        :param key: The key of the resource
+        :type key: str
+        :param default: Returned when there is neither a usable value nor an error
+        :type default: str
+        :return: The cached value, the last error or the default
+        :rtype: str
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.age() <= self.ttl + self.stale_ttl:
+            return entry.value
+        return self._errors.get(key, default)
+
+    def is_fresh(self, key: str) -> bool:
+        """Check whether the cached value does not need to be revalidated yet"""
+        entry = self._entries.get(key)
+        return entry is not None and entry.age() <= self.ttl
+
+    def stable_seconds(self, key: str) -> float:
+        """Get the seconds since the cached value changed the last time. 0 when there is no value"""
+        entry = self._entries.get(key)
+        return time() - entry.changed_at if entry is not None else 0
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Get the headers for a conditional request, so an unchanged resource is answered with a 304"""
+        headers = {}
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: str, value: str, headers: Mapping[str, str] = None) -> str:
+        """Store a freshly fetched value
+
+        :param key: The key of the resource
+        :type key: str
+        :param value: The value
+        :type value: str
+        :param headers: The response headers to take the validators from
+        :type headers: Mapping[str, str]
+        :return: The value
+        :rtype: str
+        """
+        headers = headers or {}
+        previous = self._entries.get(key)
+        entry = CacheEntry(value, headers.get("ETag"), headers.get("Last-Modified"))
+        if previous is not None and previous.value == value:
+            entry.changed_at = previous.changed_at
+        self._entries[key] = entry
+        self._errors.pop(key, None)
+        return value
+
+    def revalidated(self, key: str) -> str:
+        """Mark the cached value as fresh again, because the upstream answered with a 304 Not Modified
+
+        :return: The cached value
+        :rtype: str
+
+        :raises KeyError: When there is no cached value
+        """
+        entry = self._entries[key]
+        entry.fetched_at = time()
+        self._errors.pop(key, None)
+        return entry.value
+
+    def fail(self, key: str, error: str):
+        """Remember a failed fetch. The stale value is still served until it expires.
+
+        :param key: The key of the resource
+        :type key: str
+        :param error: The message to display when there is no usable value anymore
+        :type error: str
+        """
+        self._errors[key] = error
@@ -0,0 +1,81 @@
+import asyncio
+from time import monotonic
+from typing import Dict, Iterable, List
+
+import aiohttp
+
+from .Http import create_session
+from .Server import Server
+
+
+class Fleet:
+    """A group of FiveM servers whose states are requested concurrently"""
+
+    def __init__(self, max_concurrency: int = 20, host_interval: float = 0.0):
+        self.servers: Dict[str, Server] = {}
+        """The servers of the fleet by their name"""
+        self.max_concurrency: int = max_concurrency
+        """How many status requests may run at the same time"""
+        self.host_interval: float = host_interval
+        """The minimum amount of seconds between two status requests to the same host"""
+        self._semaphore: asyncio.Semaphore = None
+        """Limits the concurrent status requests. Created on the first request"""
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        """Serializes the status requests per host to apply the rate limit"""
+        self._host_last_request: Dict[str, float] = {}
+        """The monotonic time of the last status request per host"""
+        self._session: aiohttp.ClientSession = None
+        """The HTTP session shared by all servers of the fleet"""
+
+    def add(self, server: Server):
+        """Add a server to the fleet. The name of the server must be unique within the fleet"""
+        if server.name in self.servers:
+            raise ValueError("a server with the name " + server.name + " is already part of the fleet")
+        self.servers[server.name] = server
+
+    def get(self, name: str) -> Server:
+        """Get a server of the fleet by its name
+
+        :raises KeyError: When there is no server with this name
+        """
+        return self.servers[name]
+
+    async def request_states(self, servers: Iterable[Server] = None) -> List[Server]:
+        """Request the states of all given servers concurrently.
+        The whole call takes about as long as the slowest single status request.
+
+        :param servers: The servers to request. Defaults to all servers of the fleet
+        :type servers: Iterable[Server]
+        :return: The requested servers
+        :rtype: List[Server]
+        """
+        if servers is None:
+            servers = list(self.servers.values())
+        else:
+            servers = list(servers)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._session is None or self._session.closed:
+            self._session = create_session(limit=self.max_concurrency)
+        await asyncio.gather(*(self._request_state(server) for server in servers))
+        return servers
+
+    async def _request_state(self, server: Server):
+        """Request the state of one server while respecting the concurrency cap and the per host rate limit"""
+        server.set_session(self._session)
+        lock = self._host_locks.setdefault(server.host, asyncio.Lock())
+        async with lock:
+            wait = self._host_last_request.get(server.host, -self.host_interval) + self.host_interval - monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_last_request[server.host] = monotonic()
+        async with self._semaphore:
+            await server.request_state()
+
+    async def close(self):
+        """Close the shared HTTP session and the sessions of the servers"""
+        for server in self.servers.values():
+            await server.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
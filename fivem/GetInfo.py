@@ -0,0 +1,107 @@
+import asyncio
+import os
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+PREFIX = b"\xff\xff\xff\xff"
+"""The header of every connectionless packet"""
+
+
+class InfoResponse:
+    """The answer of a FiveM server to the connectionless ``getinfo`` query"""
+
+    def __init__(self, values: Dict[str, str], rtt: float):
+        self.values: Dict[str, str] = values
+        """All key value pairs of the answer"""
+        self.rtt: float = rtt
+        """The round trip time of the answered query in ms"""
+
+    @property
+    def clients(self) -> int:
+        """The amount of players on the server
+
+        :raises ValueError: When the answer has no valid player amount, e.g. because it is malformed
+        """
+        value = self.values.get("clients")
+        if value is None:
+            raise ValueError("the infoResponse has no clients")
+        return int(value)
+
+    @property
+    def max_clients(self) -> Optional[int]:
+        """The maximum amount of players or None when the server does not tell it"""
+        value = self.values.get("sv_maxclients")
+        return int(value) if value and value.isdigit() else None
+
+
+def parse_info_response(packet: bytes) -> Dict[str, str]:
+    """Parse an ``infoResponse`` packet into its key value pairs
+
+    :raises ValueError: When the packet is not an infoResponse
+    """
+    header = PREFIX + b"infoResponse"
+    if not packet.startswith(header):
+        raise ValueError("not an infoResponse")
+    parts = packet[len(header):].strip().decode("utf-8", "replace").split("\\")
+    # the payload starts with a backslash, so the first part is empty
+    return dict(zip(parts[1::2], parts[2::2]))
+
+
+class _InfoProtocol(asyncio.DatagramProtocol):
+    """Resolves the waiter with the first infoResponse carrying the expected challenge"""
+
+    def __init__(self):
+        self.challenge: str = ""
+        """The challenge of the query which is currently waited for"""
+        self.waiter: Optional[asyncio.Future] = None
+        """Resolved with the values of the answer"""
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+        try:
+            values = parse_info_response(data)
+        except ValueError:
+            return
+        # answers to an earlier, timed out attempt are ignored
+        if values.get("challenge") == self.challenge and self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(values)
+
+    def error_received(self, exc: Exception):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_exception(exc)
+
+
+async def request_info(host: str, port: int, timeout: float = 0.5, retries: int = 2) -> InfoResponse:
+    """Send the connectionless ``getinfo`` query to a FiveM server over UDP.
+    The answer is a single small packet, independent of the amount of players.
+
+    :param host: The IP or hostname of the server
+    :type host: str
+    :param port: The game port of the server
+    :type port: int
+    :param timeout: The seconds to wait for an answer per attempt
+    :type timeout: float
+    :param retries: How often the query is repeated when it was not answered
+    :type retries: int
+    :return: The answer of the last attempt
+    :rtype: InfoResponse
+
+    :raises asyncio.TimeoutError: When no attempt was answered
+    :raises OSError: When the query could not be sent, e.g. because the port is closed
+    """
+    loop = asyncio.get_event_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_InfoProtocol, remote_addr=(host, port))
+    try:
+        for attempt in range(retries + 1):
+            protocol.challenge = os.urandom(6).hex()
+            protocol.waiter = loop.create_future()
+            started = monotonic()
+            transport.sendto(PREFIX + b"getinfo " + protocol.challenge.encode("ascii"))
+            try:
+                values = await asyncio.wait_for(protocol.waiter, timeout)
+            except asyncio.TimeoutError:
+                if attempt == retries:
+                    raise
+                continue
+            return InfoResponse(values, (monotonic() - started) * 1000)
+    finally:
+        transport.close()
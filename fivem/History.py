@@ -0,0 +1,249 @@
+import math
+import mmap
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .State import State
+
+_HEADER = struct.Struct("<4sHHIQ")
+"""magic, version, block size, capacity, count of all appended samples"""
+_HEADER_SIZE = 64
+_SAMPLE = struct.Struct("<dBxHfddd")
+"""timestamp, state, players, latency in ms (negative when failed), cumulated seconds, online seconds, player seconds"""
+_BLOCK_SIZE = 64
+"""How many samples are summarized in one block"""
+_LATENCY_BUCKETS = 64
+"""The latency histogram has 4 buckets per doubling, so the last bucket starts at 2^16 ms"""
+_BLOCK = struct.Struct("<QH2x" + str(_LATENCY_BUCKETS) + "I")
+"""absolute block number, peak players, latency histogram"""
+_MAGIC = b"FVMH"
+_VERSION = 1
+
+
+def _latency_bucket(latency: float) -> int:
+    """Get the histogram bucket of a latency in ms"""
+    return min(_LATENCY_BUCKETS - 1, int(math.log2(latency + 1) * 4))
+
+
+def _bucket_latency(bucket: int) -> float:
+    """Get the representative latency in ms of a histogram bucket (its geometric center)"""
+    return 2 ** ((bucket + 0.5) / 4) - 1
+
+
+class HistoryStats:
+    """Aggregated samples of a time window of a :class:`History`"""
+
+    def __init__(self, samples: int, availability: Optional[float], peak_players: int,
+                 average_players: Optional[float], latency_percentiles: Dict[int, float]):
+        self.samples: int = samples
+        """The amount of samples in the window"""
+        self.availability: Optional[float] = availability
+        """The fraction of the time the server was online, between 0 and 1. None without data"""
+        self.peak_players: int = peak_players
+        """The maximum amount of players"""
+        self.average_players: Optional[float] = average_players
+        """The time weighted average amount of players. None without data"""
+        self.latency_percentiles: Dict[int, float] = latency_percentiles
+        """The latency in ms of the successful requests by percentile, e.g. {50: 42.0, 95: 120.3}"""
+
+
+class History:
+    """Persistent fixed-size ring buffer of the requested states of a FiveM server, stored in a memory-mapped file.
+
+    Every sample stores running sums, so the availability and the average players of any window are computed from
+    the two samples at its edges. The peak players and a latency histogram are summarized per block of 64 samples,
+    so only the samples of the two partial blocks at the edges of a window have to be read.
+    """
+
+    def __init__(self, path: str, capacity: int = 131072, max_gap: float = 600):
+        """
+        :param path: The file to store the samples in. Created if it does not exist
+        :type path: str
+        :param capacity: How many samples are kept. Rounded up to a multiple of 64
+        :type capacity: int
+        :param max_gap: Longer gaps between two samples (e.g. while the bot was offline) are not counted as known time
+        :type max_gap: float
+        """
+        self.capacity: int = -(-max(capacity, _BLOCK_SIZE) // _BLOCK_SIZE) * _BLOCK_SIZE
+        """How many samples are kept"""
+        self.max_gap: float = max_gap
+        """Longer gaps between two samples are not counted"""
+        self._blocks_offset: int = _HEADER_SIZE + self.capacity * _SAMPLE.size
+        size = self._blocks_offset + self.capacity // _BLOCK_SIZE * _BLOCK.size
+        exists = os.path.exists(path) and os.path.getsize(path) == size
+        self._file = open(path, "r+b" if exists else "w+b")
+        if not exists:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        magic, version, block_size, capacity, count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or block_size != _BLOCK_SIZE or capacity != self.capacity:
+            count = 0
+            _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, _BLOCK_SIZE, self.capacity, count)
+        self._count: int = count
+        """The amount of all samples ever appended. The absolute index of the next sample"""
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def _first(self) -> int:
+        """The absolute index of the oldest sample which is still kept"""
+        return max(0, self._count - self.capacity)
+
+    def _sample(self, index: int) -> tuple:
+        """Read the sample with the absolute index"""
+        return _SAMPLE.unpack_from(self._map, _HEADER_SIZE + (index % self.capacity) * _SAMPLE.size)
+
+    def _timestamp(self, index: int) -> float:
+        return struct.unpack_from("<d", self._map, _HEADER_SIZE + (index % self.capacity) * _SAMPLE.size)[0]
+
+    def _block(self, number: int) -> tuple:
+        """Read the summary of the block with the absolute block number"""
+        offset = self._blocks_offset + (number % (self.capacity // _BLOCK_SIZE)) * _BLOCK.size
+        return _BLOCK.unpack_from(self._map, offset)
+
+    def append(self, timestamp: float, state: State, players: int, latency: Optional[float]):
+        """Append a sample. Overwrites the oldest sample when the buffer is full.
+
+        :param timestamp: When the sample was taken. Earlier timestamps than the last one are moved to the last one
+        :type timestamp: float
+        :param state: The state of the server
+        :type state: State
+        :param players: The amount of players
+        :type players: int
+        :param latency: The latency of the request in ms or None when the request failed
+        :type latency: Optional[float]
+        """
+        index = self._count
+        players = min(max(players, 0), 0xFFFF)
+        if index > 0:
+            last_timestamp, last_state, last_players, _, total, online, player_seconds = self._sample(index - 1)
+            timestamp = max(timestamp, last_timestamp)
+            gap = timestamp - last_timestamp
+            if gap <= self.max_gap:
+                total += gap
+                if last_state == State.ONLINE.value:
+                    online += gap
+                player_seconds += gap * last_players
+        else:
+            total = online = player_seconds = 0.0
+        latency_value = -1.0 if latency is None else latency
+        _SAMPLE.pack_into(self._map, _HEADER_SIZE + (index % self.capacity) * _SAMPLE.size,
+                          timestamp, state.value, players, latency_value, total, online, player_seconds)
+        # update the summary of the block
+        number = index // _BLOCK_SIZE
+        offset = self._blocks_offset + (number % (self.capacity // _BLOCK_SIZE)) * _BLOCK.size
+        if index % _BLOCK_SIZE == 0:
+            block = [number, 0] + [0] * _LATENCY_BUCKETS
+        else:
+            block = list(_BLOCK.unpack_from(self._map, offset))
+        block[1] = max(block[1], players)
+        if latency is not None:
+            block[2 + _latency_bucket(latency)] += 1
+        _BLOCK.pack_into(self._map, offset, *block)
+        self._count = index + 1
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, _BLOCK_SIZE, self.capacity, self._count)
+
+    def _search(self, timestamp: float, right: bool) -> int:
+        """Binary search the absolute index of the first sample after (right) or at least at the timestamp"""
+        indexes = range(self._first, self._count)
+        key = _TimestampView(self, indexes)
+        if right:
+            return indexes.start + bisect_right(key, timestamp)
+        return indexes.start + bisect_left(key, timestamp)
+
+    def samples(self, start: float, end: float) -> Iterator[Tuple[float, State, int]]:
+        """Iterate over the samples between the two timestamps
+
+        :return: The timestamp, the state and the players of every sample, from the oldest to the newest
+        :rtype: Iterator[Tuple[float, State, int]]
+        """
+        for index in range(self._search(start, False), self._search(end, True)):
+            timestamp, state, players = self._sample(index)[:3]
+            yield timestamp, State(state), players
+
+    def stats(self, start: float, end: float, percentiles: List[int] = (50, 95, 99)) -> HistoryStats:
+        """Aggregate the samples between the two timestamps
+
+        :param start: The start of the window as a timestamp
+        :type start: float
+        :param end: The end of the window as a timestamp
+        :type end: float
+        :param percentiles: The latency percentiles to calculate
+        :type percentiles: List[int]
+        :return: The aggregated samples
+        :rtype: HistoryStats
+        """
+        first = self._search(start, right=False)
+        last = self._search(end, right=True) - 1
+        if last < first:
+            return HistoryStats(0, None, 0, None, {})
+        first_sample = self._sample(first)
+        last_sample = self._sample(last)
+        total = last_sample[4] - first_sample[4]
+        availability = (last_sample[5] - first_sample[5]) / total if total > 0 else None
+        average_players = (last_sample[6] - first_sample[6]) / total if total > 0 else None
+        if availability is None:
+            # only a single sample or samples without time between them
+            availability = 1.0 if last_sample[1] == State.ONLINE.value else 0.0
+            average_players = float(last_sample[2])
+
+        peak = 0
+        histogram = [0] * _LATENCY_BUCKETS
+        first_full = -(-first // _BLOCK_SIZE)
+        last_full = (last + 1) // _BLOCK_SIZE  # exclusive
+        if first_full < last_full:
+            edges = [range(first, first_full * _BLOCK_SIZE), range(last_full * _BLOCK_SIZE, last + 1)]
+            for number in range(first_full, last_full):
+                block = self._block(number)
+                peak = max(peak, block[1])
+                for bucket in range(_LATENCY_BUCKETS):
+                    histogram[bucket] += block[2 + bucket]
+        else:
+            edges = [range(first, last + 1)]
+        for edge in edges:
+            for index in edge:
+                sample = self._sample(index)
+                peak = max(peak, sample[2])
+                if sample[3] >= 0:
+                    histogram[_latency_bucket(sample[3])] += 1
+
+        latency_percentiles = {}
+        successful = sum(histogram)
+        if successful:
+            for percentile in percentiles:
+                rank = max(1, math.ceil(successful * percentile / 100))
+                seen = 0
+                for bucket, amount in enumerate(histogram):
+                    seen += amount
+                    if seen >= rank:
+                        latency_percentiles[percentile] = _bucket_latency(bucket)
+                        break
+        return HistoryStats(last - first + 1, availability, peak, average_players, latency_percentiles)
+
+    def flush(self):
+        """Write the changes to the disk"""
+        self._map.flush()
+
+    def close(self):
+        """Write the changes to the disk and close the file"""
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+
+
+class _TimestampView:
+    """Sequence view of the timestamps of the samples for the binary search"""
+
+    def __init__(self, history: History, indexes: range):
+        self._history = history
+        self._indexes = indexes
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __getitem__(self, item):
+        return self._history._timestamp(self._indexes[item])
@@ -0,0 +1,23 @@
+import aiohttp
+
+
+def create_session(limit: int = 100, limit_per_host: int = 0, keepalive_timeout: float = 60) -> aiohttp.ClientSession:
+    """Create a pooled HTTP session with keep-alive connections.
+    Must be called while an event loop is running.
+
+    :param limit: The maximum amount of simultaneous connections
+    :type limit: int
+    :param limit_per_host: The maximum amount of simultaneous connections to the same host. 0 means no limit
+    :type limit_per_host: int
+    :param keepalive_timeout: How long an idle connection is kept open in seconds
+    :type keepalive_timeout: float
+    :return: The new session
+    :rtype: aiohttp.ClientSession
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(connector=connector)
@@ -0,0 +1,169 @@
+import asyncio
+import inspect
+from time import time
+from typing import Callable, Dict, List, Optional
+
+IDENTIFIER_PRIORITY = ("license", "discord", "steam")
+"""The identifier types used to recognize a player, in the order of preference"""
+
+
+class Player:
+    """A player on the FiveM server, as listed in the players.json"""
+
+    __slots__ = ("key", "name", "server_id", "joined_at", "_generation")
+
+    def __init__(self, key: str, name: str, server_id: int):
+        self.key: str = key
+        """The identifier which recognizes the player, e.g. ``license:abc``"""
+        self.name: str = name
+        """The player name"""
+        self.server_id: int = server_id
+        """The temporary ID of the player on the server"""
+        self.joined_at: int = int(time())
+        """The timestamp when the player joined, or was seen the first time"""
+        self._generation: int = 0
+        """The update of the index in which the player was seen the last time"""
+
+    def get_session_seconds(self) -> int:
+        """Get how many seconds the player is on the server"""
+        return int(time()) - self.joined_at
+
+    def to_dict(self) -> dict:
+        """Get the player as JSON serializable dict, to recreate it with :func:`from_dict`"""
+        return {"key": self.key, "name": self.name, "server_id": self.server_id, "joined_at": self.joined_at}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Player":
+        """Recreate a player from a dict created by :func:`to_dict`
+
+        :raises KeyError: When a field is missing
+        """
+        player = cls(str(data["key"]), str(data["name"]), data.get("server_id"))
+        player.joined_at = int(data["joined_at"])
+        return player
+
+
+def player_key(player: dict) -> Optional[str]:
+    """Get the identifier to recognize a player from an entry of the players.json.
+    Falls back to the server ID, when the server hides the identifiers.
+
+    :return: The identifier or None when the entry has neither identifiers nor an ID
+    :rtype: Optional[str]
+    """
+    identifiers = player.get("identifiers") or ()
+    for prefix in IDENTIFIER_PRIORITY:
+        for identifier in identifiers:
+            if identifier.startswith(prefix + ":"):
+                return identifier
+    if player.get("id") is not None:
+        return "id:" + str(player["id"])
+    return None
+
+
+class PlayerIndex:
+    """The players currently on a FiveM server, keyed by their identifier.
+
+    Every update marks the seen players with a new generation instead of building new sets,
+    so the players who left are only searched when the amounts show that somebody left.
+    """
+
+    def __init__(self):
+        self.players: Dict[str, Player] = {}
+        """The current players by their identifier"""
+        self._generation: int = 0
+        """The number of the last update"""
+        self.seeded: bool = False
+        """Whether the index knows who is on the server. Until then, an update only seeds it without notifying,
+        so the players who were already online when the bot started are not reported as joined"""
+        self._listeners: List[Callable] = []
+        """Called with the joined and the left players after an update"""
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def subscribe(self, listener: Callable[[List[Player], List[Player]], None]):
+        """Register a listener, which is called with the lists of the joined and the left players,
+        whenever an update changed the players. Coroutine functions are scheduled as a task."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable):
+        """Remove a registered listener"""
+        self._listeners.remove(listener)
+
+    def update(self, players: List[dict]):
+        """Update the index with the current players.json and notify the listeners about the changes.
+        The first update of an index which was neither seeded nor restored notifies nobody
+
+        :param players: The parsed players.json
+        :type players: List[dict]
+        """
+        self._generation += 1
+        generation = self._generation
+        index = self.players
+        joined = []
+        seen = 0
+        for entry in players:
+            key = player_key(entry)
+            if key is None:
+                continue
+            player = index.get(key)
+            if player is None:
+                player = Player(key, str(entry.get("name", "")), entry.get("id"))
+                index[key] = player
+                joined.append(player)
+            elif player._generation != generation:
+                seen += 1
+                player.server_id = entry.get("id")
+            player._generation = generation
+        left = []
+        if seen + len(joined) != len(index):
+            left = [player for player in index.values() if player._generation != generation]
+            for player in left:
+                del index[player.key]
+        if not self.seeded:
+            self.seeded = True
+            return
+        self._notify(joined, left)
+
+    def restore(self, players: List[Player]):
+        """Replace the players with the ones of a snapshot without notifying the listeners, e.g. after a restart
+
+        :param players: The players, see :func:`Player.from_dict`
+        :type players: List[Player]
+        """
+        self.players = {player.key: player for player in players}
+        for player in players:
+            player._generation = self._generation
+        self.seeded = True
+
+    def clear(self):
+        """Remove all players, e.g. when the server went offline, and notify the listeners.
+        The index is seeded afterwards, because the server is known to be empty"""
+        left = list(self.players.values())
+        self.players.clear()
+        self.seeded = True
+        self._notify([], left)
+
+    def replay(self, joined: List[Player], left: List[Player]):
+        """Apply the changes observed by another index, e.g. the one of the probe worker, and notify the listeners.
+        Changes which this index already knows, e.g. because it was cleared itself, are ignored.
+
+        :param joined: The players who joined
+        :type joined: List[Player]
+        :param left: The players who left
+        :type left: List[Player]
+        """
+        joined = [player for player in joined if player.key not in self.players]
+        for player in joined:
+            self.players[player.key] = player
+        left = [self.players.pop(player.key) for player in left if player.key in self.players]
+        self._notify(joined, left)
+
+    def _notify(self, joined: List[Player], left: List[Player]):
+        """Call the listeners, if something changed"""
+        if not joined and not left:
+            return
+        for listener in self._listeners:
+            result = listener(joined, left)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
@@ -0,0 +1,88 @@
+from array import array
+from typing import List, Optional, Tuple
+
+
+class MinuteRollup:
+    """The requested states of the last hours, downsampled into one bucket per minute.
+
+    The memory is fixed: the bucket of a minute is reused when the same minute of the next window comes around.
+    A bucket stores the peak players, how many requests found the server online and how many requests were made.
+    """
+
+    def __init__(self, minutes: int = 1440):
+        """
+        :param minutes: How many minutes are kept. 1440 for 24 hours
+        :type minutes: int
+        """
+        self.minutes: int = minutes
+        """How many minutes are kept"""
+        self.version: int = 0
+        """Increases whenever a bucket changed in a way which is visible in a chart"""
+        self._minute = array("q", [-1]) * minutes
+        """The absolute minute of every bucket, -1 for an empty bucket"""
+        self._peak = array("H", [0]) * minutes
+        """The peak players of every bucket"""
+        self._online = array("H", [0]) * minutes
+        """How many requests of every bucket found the server online"""
+        self._samples = array("H", [0]) * minutes
+        """How many requests were made in every bucket"""
+
+    @staticmethod
+    def _availability_class(online: int, samples: int) -> int:
+        """0 when the server was always offline, 2 when it was always online, otherwise 1"""
+        if online == 0:
+            return 0
+        return 2 if online == samples else 1
+
+    def add(self, timestamp: float, online: bool, players: int) -> bool:
+        """Add the result of a request
+
+        :param timestamp: When the request was made
+        :type timestamp: float
+        :param online: Whether the server was online
+        :type online: bool
+        :param players: The amount of players
+        :type players: int
+        :return: Whether the bucket changed visibly, i.e. it is new, got a new peak or its availability changed
+        :rtype: bool
+        """
+        minute = int(timestamp // 60)
+        i = minute % self.minutes
+        if self._minute[i] > minute:
+            # older than the kept window
+            return False
+        players = min(max(players, 0), 0xFFFF) if online else 0
+        if self._minute[i] != minute:
+            self._minute[i] = minute
+            self._peak[i] = players
+            self._online[i] = int(online)
+            self._samples[i] = 1
+            self.version += 1
+            return True
+        before = (self._peak[i], self._availability_class(self._online[i], self._samples[i]))
+        if self._samples[i] < 0xFFFF:
+            self._samples[i] += 1
+            self._online[i] += int(online)
+        self._peak[i] = max(self._peak[i], players)
+        if before != (self._peak[i], self._availability_class(self._online[i], self._samples[i])):
+            self.version += 1
+            return True
+        return False
+
+    def buckets(self, now: float) -> List[Optional[Tuple[int, float]]]:
+        """Get the buckets of the kept window up to now, from the oldest to the current minute
+
+        :param now: The current timestamp
+        :type now: float
+        :return: The peak players and the availability between 0 and 1 per minute. None for minutes without requests
+        :rtype: List[Optional[Tuple[int, float]]]
+        """
+        last = int(now // 60)
+        result = []
+        for minute in range(last - self.minutes + 1, last + 1):
+            i = minute % self.minutes
+            if self._minute[i] != minute:
+                result.append(None)
+            else:
+                result.append((self._peak[i], self._online[i] / self._samples[i]))
+        return result
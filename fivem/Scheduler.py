@@ -0,0 +1,100 @@
+import random
+from time import time
+
+from .Server import Server
+
+
+class PollScheduler:
+    """Decides when something should be requested the next time.
+
+    Right after a change, the interval is ``min_interval``. The longer nothing changes,
+    the more the interval grows, doubling every ``stable_after`` seconds, up to ``max_interval``.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, jitter: float = 0.1, stable_after: float = 300):
+        self.min_interval: float = min_interval
+        """The shortest interval in seconds"""
+        self.max_interval: float = max(min_interval, max_interval)
+        """The longest interval in seconds"""
+        self.jitter: float = jitter
+        """The maximum random deviation of an interval as a fraction, e.g. 0.1 for +-10%"""
+        self.stable_after: float = stable_after
+        """After how many seconds without a change the interval doubles"""
+        self.due_at: float = time()
+        """The timestamp when the next request is due"""
+
+    def next_delay(self, stable_seconds: float, urgent: bool = False) -> float:
+        """Calculates the seconds until the next request
+
+        :param stable_seconds: How many seconds nothing has changed
+        :type stable_seconds: float
+        :param urgent: Whether a change is expected soon, so the shortest interval should be used
+        :type urgent: bool
+        :return: The delay in seconds
+        :rtype: float
+        """
+        if urgent or self.stable_after <= 0:
+            delay = self.min_interval
+        else:
+            delay = self.min_interval * 2 ** min(max(stable_seconds, 0) / self.stable_after, 32)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(max(delay, self.min_interval), self.max_interval)
+
+    def reschedule(self, stable_seconds: float, urgent: bool = False) -> float:
+        """Set the time of the next request
+
+        :return: The delay in seconds until the next request
+        :rtype: float
+        """
+        delay = self.next_delay(stable_seconds, urgent)
+        self.due_at = time() + delay
+        return delay
+
+    def back_off(self, failures: int) -> float:
+        """Set the time of the next request after failed requests.
+        The interval doubles with every failure in a row, up to ``max_interval``
+
+        :param failures: How many requests failed in a row
+        :type failures: int
+        :return: The delay in seconds until the next request
+        :rtype: float
+        """
+        delay = self.min_interval * 2 ** min(failures, 32) * random.uniform(1 - self.jitter, 1 + self.jitter)
+        delay = min(max(delay, self.min_interval), self.max_interval)
+        self.due_at = time() + delay
+        return delay
+
+    def wake(self):
+        """Make the next request due immediately"""
+        self.due_at = time()
+
+    def is_due(self) -> bool:
+        """Check whether the next request is due"""
+        return self.due_at <= time()
+
+
+class ServerPollScheduler(PollScheduler):
+    """Schedules the status requests of a FiveM server.
+    The server is requested often after a state change, while it is not online and while a restart approaches."""
+
+    def __init__(self, server: Server, min_interval: float, max_interval: float, jitter: float = 0.1,
+                 stable_after: float = 300, restart_lead: float = 120):
+        super().__init__(min_interval, max_interval, jitter, stable_after)
+        self.server: Server = server
+        """The server to schedule"""
+        self.restart_lead: float = restart_lead
+        """How many seconds before the next restart the shortest interval is used"""
+
+    def is_urgent(self) -> bool:
+        """Check whether a change of the server state is expected soon"""
+        now = time()
+        return not self.server.is_online() or self.server.last_request_failed \
+            or self.server.next_restart - self.restart_lead <= now <= self.server.next_restart + self.restart_lead
+
+    def reschedule_server(self) -> float:
+        """Set the time of the next status request depending on the server state
+
+        :return: The delay in seconds until the next request
+        :rtype: float
+        """
+        return self.reschedule(time() - self.server.state_changed_at, self.is_urgent())
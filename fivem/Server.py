@@ -1,8 +1,15 @@
+import asyncio
+from collections import deque
 from enum import Enum
-from time import time
+from time import monotonic, time
+from typing import Deque, Dict, Optional, Tuple
 
-import requests
+import aiohttp
 
+from .ArrayCounter import ArrayCounter
+from .GetInfo import InfoResponse, request_info
+from .Http import create_session
+from .Players import Player, PlayerIndex
 from .State import State
 
 
@@ -24,21 +31,306 @@ class Server:
         Therefore is this indicator to check if the server was offline twice, then reset the uptime."""
         self._state: Enum = State.OFFLINE
         """The last server state of the FiveM server"""
+        self.player_index: Optional[PlayerIndex] = PlayerIndex() if kwargs.get("track_players") else None
+        """The current players by their identifier. Only tracked when created with ``track_players=True``"""
+        self.latency: Optional[float] = None
+        """The duration of the last successful status request in ms. None when it failed"""
+        self.request_duration: float = 0.0
+        """The duration of the last status request in seconds, also when it failed"""
+        self.state_changed_at: int = int(time())
+        """The timestamp when the state of the server changed the last time"""
         self._ip: str = kwargs.get("ip")
         """The IP (with port) of the server to handle with"""
+        self.name: str = kwargs.get("name", self._ip)
+        """The name to identify the server, e.g. in a :class:`fivem.Fleet`"""
+        self._session: aiohttp.ClientSession = kwargs.get("session")
+        """The pooled HTTP session used for the status requests. Created on the first request if not given"""
+        self._owns_session: bool = self._session is None
+        """Whether the session was created by this object and has to be closed by it"""
+        self.timeout = aiohttp.ClientTimeout(
+            total=kwargs.get("total_timeout", 3),
+            sock_connect=kwargs.get("connect_timeout", 1.5),
+            sock_read=kwargs.get("read_timeout", 2),
+        )
+        """The deadlines of a status request. Connecting, waiting for the first byte and the whole request"""
+        self.probe: str = kwargs.get("probe", "http")
+        """How the state is requested. ``http`` for the players.json, ``udp`` for the getinfo query,
+        ``count`` for counting the players while the players.json is read and ``dynamic`` for the dynamic.json"""
+        self.udp_timeout: float = kwargs.get("udp_timeout", 0.5)
+        """The seconds to wait for the answer of one getinfo query"""
+        self.udp_retries: int = kwargs.get("udp_retries", 2)
+        """How often an unanswered getinfo query is repeated"""
+        self.full_refresh_interval: float = kwargs.get("full_refresh_interval", 300)
+        """In the udp probe mode, the players.json is still requested after this amount of seconds.
+        In the count and dynamic modes only, when the players are tracked"""
+        self.max_clients: Optional[int] = None
+        """The maximum amount of players as told by the getinfo query or the dynamic.json. None when unknown"""
+        self._dynamic_available: bool = True
+        """Whether the server answers the dynamic.json with the player amount"""
+        self._full_refresh_at: float = float("-inf")
+        """The monotonic time of the last successful players.json request"""
+        self.udp_failure_limit: int = kwargs.get("udp_failure_limit", 2)
+        """After how many unanswered getinfo queries in a row the udp mode is paused for a full refresh interval"""
+        self._udp_failures: int = 0
+        """How many getinfo queries in a row were not answered"""
+        self._udp_paused_until: float = float("-inf")
+        """The monotonic time until which no getinfo query is sent, e.g. because the port is filtered"""
+        self.hedge: bool = kwargs.get("hedge", True)
+        """Whether a second status request is sent, when the first one is slower than usual"""
+        self.hedged_requests: int = 0
+        """How many second status requests were sent"""
+        self.failure_threshold: int = kwargs.get("failure_threshold", 2)
+        """How many of the recent status requests must fail, before an online server counts as down"""
+        self._outcomes: Deque[bool] = deque(maxlen=kwargs.get("state_window", 3))
+        """Whether the recent status requests succeeded"""
+        self._rtt_samples: Dict[bool, Deque[float]] = {
+            full: deque(maxlen=kwargs.get("rtt_window", 32)) for full in (False, True)
+        }
+        """The round trip times of the recent successful status requests in ms, by whether they downloaded the
+        players.json. The full refreshes are much slower than the getinfo query or the dynamic.json,
+        so they are hedged on their own round trip times"""
+        self.latency_full: bool = True
+        """Whether the last successful status request downloaded the players.json"""
 
-    def request_state(self):
-        """Requests the Status from the FiveM server and assign it to the object attributes"""
+    @property
+    def host(self) -> str:
+        """The IP or hostname of the server without the port"""
+        return self._ip.rsplit(":", 1)[0]
+
+    @property
+    def port(self) -> int:
+        """The port of the server. 30120 when the IP has no port"""
+        if ":" not in self._ip:
+            return 30120
+        return int(self._ip.rsplit(":", 1)[1])
+
+    def set_session(self, session: aiohttp.ClientSession):
+        """Use a shared HTTP session for the status requests. The session is not closed by this object"""
+        if self._session is not session:
+            if self._owns_session and self._session is not None and not self._session.closed:
+                asyncio.ensure_future(self._session.close())
+            self._session = session
+            self._owns_session = False
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the HTTP session for the status requests. Creates a new one when there is none"""
+        if self._session is None or self._session.closed:
+            self._session = create_session(limit_per_host=2)
+            self._owns_session = True
+        return self._session
+
+    async def request_state(self):
+        """Requests the Status from the FiveM server and assign it to the object attributes.
+        In the udp probe mode, the players.json is only requested when the getinfo query failed,
+        for the periodic full refresh or when the player amount of tracked players changed.
+        In the count and dynamic modes, it is only parsed completely for the full refresh of tracked players
+        or when their amount changed.
+
+        A failed request only changes the state of an online server,
+        when at least ``failure_threshold`` of the last ``state_window`` requests failed."""
+        started = monotonic()
+        self.latency = None
         # noinspection PyBroadException
         try:
-            r = requests.get("http://" + self._ip + "/players.json", timeout=3)
-            self.players = len(r.json())
-        except (requests.exceptions.Timeout, requests.exceptions.URLRequired, requests.exceptions.InvalidURL):
-            self.set_state_not_reachable()
+            players, player_list, rtt, full = await self._hedged_probe()
+        except (asyncio.TimeoutError, aiohttp.InvalidURL):
+            self._outcomes.append(False)
+            if not self._tolerate_failure():
+                self.set_state_not_reachable()
+        except asyncio.CancelledError:
+            raise
         except:
-            self.set_state_offline()
+            self._outcomes.append(False)
+            if not self._tolerate_failure():
+                self.set_state_offline()
         else:
+            self._outcomes.append(True)
+            self.add_latency_sample(rtt, full)
+            self.players = players
+            self.latency = rtt
+            self.latency_full = full
+            if player_list is not None and self.player_index is not None:
+                self.player_index.update(player_list)
             self.set_state_online()
+        finally:
+            self.request_duration = monotonic() - started
+
+    def _tolerate_failure(self) -> bool:
+        """Check whether a failed request is treated as a lost packet and the server stays online"""
+        return self.is_online() and self._outcomes.count(False) < self.failure_threshold
+
+    def hedge_delay(self, full: bool = True) -> Optional[float]:
+        """The seconds after which a second status request is sent, when the first one is still not answered.
+        This is the 95th percentile of the recent round trip times of the same kind of request.
+
+        :param full: Whether the request downloads the players.json
+        :type full: bool
+        :return: The delay or None when there are too few round trip times to hedge
+        :rtype: Optional[float]
+        """
+        if not self.hedge or len(self._rtt_samples[full]) < 5:
+            return None
+        samples = sorted(self._rtt_samples[full])
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1000
+        return min(max(p95, 0.05), self.timeout.total / 2)
+
+    def add_latency_sample(self, rtt: float, full: bool = True):
+        """Remember the round trip time of a successful status request, e.g. one of another process
+
+        :param rtt: The round trip time in ms
+        :type rtt: float
+        :param full: Whether the request downloaded the players.json
+        :type full: bool
+        """
+        self._rtt_samples[full].append(rtt)
+
+    @property
+    def last_request_failed(self) -> bool:
+        """Whether the last status request failed, even if the server still counts as online"""
+        return bool(self._outcomes) and not self._outcomes[-1]
+
+    @property
+    def typical_latency(self) -> Optional[float]:
+        """The median of the recent round trip times in ms of the kind of request which is sent most.
+        None when there are none"""
+        samples = max(self._rtt_samples.values(), key=len)
+        if not samples:
+            return None
+        return sorted(samples)[len(samples) // 2]
+
+    def _is_full_request_due(self) -> bool:
+        """Whether the next status request is expected to download the players.json"""
+        now = monotonic()
+        refresh_due = now - self._full_refresh_at >= self.full_refresh_interval
+        if self.probe == "udp":
+            return refresh_due or now < self._udp_paused_until
+        if self.probe == "dynamic":
+            return not self._dynamic_available or self.player_index is not None and refresh_due
+        return True
+
+    async def _hedged_probe(self) -> Tuple[int, Optional[list], float, bool]:
+        """Sends a status request and a second one, when the first is slower than usual.
+        The first successful answer is used. A lost packet then costs the hedge delay instead of the whole timeout.
+
+        :raises Exception: The error of the first request, when both failed
+        """
+        first = asyncio.ensure_future(self._probe())
+        tasks = [first]
+        try:
+            delay = self.hedge_delay(self._is_full_request_due())
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedged_requests += 1
+                tasks.append(asyncio.ensure_future(self._probe()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return first.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _probe(self) -> Tuple[int, Optional[list], float, bool]:
+        """Sends one status request
+
+        :return: The player amount, the players.json if it was parsed, the round trip time in ms
+            and whether the players.json was downloaded
+        :rtype: Tuple[int, Optional[list], float, bool]
+        """
+        if self.probe == "udp":
+            info = await self._request_info()
+            if info is not None:
+                return info.clients, None, info.rtt, False
+        elif self.probe in ("count", "dynamic"):
+            if self.player_index is None or monotonic() - self._full_refresh_at < self.full_refresh_interval:
+                players, rtt, full = await self._count_players()
+                if self.player_index is None or players == len(self.player_index):
+                    return players, None, rtt, full
+                # somebody joined or left, the players.json tells who
+        return await self._request_players()
+
+    async def _request_players(self) -> Tuple[int, list, float, bool]:
+        """Requests the players.json over HTTP"""
+        started = monotonic()
+        async with self._get_session().get("http://" + self._ip + "/players.json", timeout=self.timeout) as r:
+            players = await r.json(content_type=None)
+        self._full_refresh_at = monotonic()
+        return len(players), players, (monotonic() - started) * 1000, True
+
+    async def _count_players(self) -> Tuple[int, float, bool]:
+        """Requests the player amount without parsing the players. From the dynamic.json in the dynamic mode,
+        otherwise or when the server does not answer it by counting the players while the players.json is read
+
+        :return: The player amount, the round trip time in ms and whether the players.json was downloaded
+        :rtype: Tuple[int, float, bool]
+        """
+        started = monotonic()
+        if self.probe == "dynamic" and self._dynamic_available:
+            async with self._get_session().get("http://" + self._ip + "/dynamic.json", timeout=self.timeout) as r:
+                if r.status != 404:
+                    r.raise_for_status()
+                    dynamic = await r.json(content_type=None)
+                else:
+                    dynamic = None
+            try:
+                players = int(dynamic["clients"])
+            except (KeyError, TypeError, ValueError):
+                # disabled or an old server, count the players.json from now on
+                self._dynamic_available = False
+            else:
+                if str(dynamic.get("sv_maxclients", "")).isdigit():
+                    self.max_clients = int(dynamic["sv_maxclients"])
+                return players, (monotonic() - started) * 1000, False
+        counter = ArrayCounter()
+        async with self._get_session().get("http://" + self._ip + "/players.json", timeout=self.timeout) as r:
+            async for chunk in r.content.iter_chunked(65536):
+                if counter.feed_bytes(chunk):
+                    break
+        if counter.count is None:
+            raise ValueError("the players.json ended too early")
+        return counter.count, (monotonic() - started) * 1000, True
+
+    async def _request_info(self) -> Optional[InfoResponse]:
+        """Requests the player amount with the getinfo query over UDP.
+        A player who left while another one joined is only noticed by the next full refresh.
+        When the queries are not answered repeatedly, the players.json is requested directly until the
+        full refresh interval passed.
+
+        :return: The answer or None when the players.json has to be requested
+        :rtype: Optional[InfoResponse]
+
+        :raises ValueError: When the answer has no player amount
+        """
+        now = monotonic()
+        if now - self._full_refresh_at >= self.full_refresh_interval or now < self._udp_paused_until:
+            return None
+        try:
+            info = await request_info(self.host, self.port, timeout=self.udp_timeout, retries=self.udp_retries)
+        except (asyncio.TimeoutError, OSError):
+            self._udp_failures += 1
+            if self._udp_failures >= self.udp_failure_limit:
+                # probably filtered, do not wait for the timeout before every request until the next full refresh
+                self._udp_failures = 0
+                self._udp_paused_until = monotonic() + self.full_refresh_interval
+            return None
+        self._udp_failures = 0
+        self.max_clients = info.max_clients
+        if self.player_index is not None and info.clients != len(self.player_index):
+            # somebody joined or left, the players.json tells who
+            return None
+        return info
+
+    async def close(self):
+        """Close the HTTP session, if it was created by this object"""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
 
     def get_downtime_seconds(self) -> int:
         """Get the downtime of the FiveM server in seconds"""
@@ -57,30 +349,101 @@ class Server:
     def set_state_online(self):
         """Normally the state is set by :func:`fivem.Server.request_state`"""
         if not self._is_restart_schedule():  # set only if its currently no restart schedule
-            self._state = State.ONLINE
+            self._set_state(State.ONLINE)
             self._is_offline_twice = False
             self.last_online = int(time())
 
     def set_state_restarting(self):
-        self._state = State.RESTARTING
+        self._set_state(State.RESTARTING)
+        if self.player_index is not None:
+            self.player_index.clear()
         self._is_offline_twice = False
         self.last_online = int(time())
         self.last_offline = int(time())
 
     def set_state_offline(self):
         if not self._is_restart_schedule():  # set only if its currently no restart schedule
-            self._state = State.OFFLINE
+            self._set_state(State.OFFLINE)
             if self._is_offline_twice:  # do not reset uptime on the first time when the server if offline
                 self.last_offline = int(time())
+                if self.player_index is not None:
+                    self.player_index.clear()
             self._is_offline_twice = True
 
     def set_state_not_reachable(self):
         if not self._is_restart_schedule():  # set only if its currently no restart schedule
-            self._state = State.NOT_REACHABLE
+            self._set_state(State.NOT_REACHABLE)
             if self._is_offline_twice:  # do not reset uptime on the first time when the server if offline
                 self.last_offline = int(time())
+                if self.player_index is not None:
+                    self.player_index.clear()
             self._is_offline_twice = True
 
+    def snapshot(self, with_players: bool = False) -> dict:
+        """Get the state of the server as JSON serializable dict, to restore it with :func:`restore`
+
+        :param with_players: Whether to include the tracked players, so they are not reported as joined again
+            and keep their session duration after a restart
+        :type with_players: bool
+        """
+        snapshot = {
+            "taken_at": int(time()),
+            "state": self._state.name,
+            "state_changed_at": self.state_changed_at,
+            "is_offline_twice": self._is_offline_twice,
+            "players": self.players,
+            "last_offline": self.last_offline,
+            "last_online": self.last_online,
+            "next_restart": self.next_restart,
+        }
+        if with_players and self.player_index is not None and self.player_index.seeded:
+            snapshot["tracked_players"] = [player.to_dict() for player in self.player_index.players.values()]
+        return snapshot
+
+    def restore(self, snapshot: dict, max_age: int = 3600) -> bool:
+        """Restore the state from a snapshot created by :func:`snapshot`
+
+        :param snapshot: The snapshot
+        :type snapshot: dict
+        :param max_age: Snapshots older than this amount of seconds are ignored
+        :type max_age: int
+        :return: Whether the snapshot was restored
+        :rtype: bool
+        """
+        try:
+            if int(time()) - int(snapshot["taken_at"]) > max_age:
+                return False
+            values = (
+                State[snapshot["state"]],
+                int(snapshot["state_changed_at"]),
+                bool(snapshot["is_offline_twice"]),
+                int(snapshot["players"]),
+                int(snapshot["last_offline"]),
+                int(snapshot["last_online"]),
+                int(snapshot["next_restart"]),
+            )
+            tracked = snapshot.get("tracked_players")
+            if tracked is not None:
+                tracked = [Player.from_dict(player) for player in tracked]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return False
+        (self._state, self.state_changed_at, self._is_offline_twice, self.players,
+         self.last_offline, self.last_online, self.next_restart) = values
+        if tracked is not None and self.player_index is not None:
+            self.player_index.restore(tracked)
+        return True
+
+    @property
+    def state(self) -> Enum:
+        """The last server state of the FiveM server"""
+        return self._state
+
+    def _set_state(self, state: Enum):
+        """Set the state and remember when it changed"""
+        if self._state != state:
+            self._state = state
+            self.state_changed_at = int(time())
+
     def is_online(self) -> bool:
         """Check whether the server's state is online or not"""
         return self._state == State.ONLINE
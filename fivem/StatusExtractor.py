@@ -0,0 +1,71 @@
+import codecs
+import html
+from html.parser import HTMLParser
+from typing import List, Optional
+
+
+class StatusExtractor(HTMLParser):
+    """Incremental parser which extracts the inner html of the ``div#company div.h2.entry-title`` element
+    from the AlleStörungen.de page. Feed it chunk by chunk and stop reading when :attr:`done` is set."""
+
+    def __init__(self, encoding: str = "utf-8"):
+        super().__init__(convert_charrefs=True)
+        self.done: bool = False
+        """Whether the status element was read completely"""
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        """Decodes the fed bytes, also when a character is split between two chunks"""
+        self._company_depth: int = 0
+        """The depth of the nested divs inside div#company. 0 when outside of it"""
+        self._title_depth: int = 0
+        """The depth of the nested divs inside the status element. 0 when outside of it"""
+        self._parts: List[str] = []
+        """The collected inner html of the status element"""
+
+    @property
+    def status(self) -> Optional[str]:
+        """The inner html of the status element, or None when it was not read completely yet"""
+        return "".join(self._parts) if self.done else None
+
+    def feed_bytes(self, chunk: bytes) -> bool:
+        """Feed the next chunk of the page
+
+        :return: Whether the status element was read completely
+        :rtype: bool
+        """
+        if not self.done:
+            self.feed(self._decoder.decode(chunk))
+        return self.done
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self._title_depth:
+            self._parts.append(self.get_starttag_text())
+            if tag == "div":
+                self._title_depth += 1
+        elif self._company_depth:
+            if tag == "div":
+                classes = (dict(attrs).get("class") or "").split()
+                if "h2" in classes and "entry-title" in classes:
+                    self._title_depth = 1
+                else:
+                    self._company_depth += 1
+        elif tag == "div" and dict(attrs).get("id") == "company":
+            self._company_depth = 1
+
+    def handle_endtag(self, tag):
+        if self.done or tag != "div" and not self._title_depth:
+            return
+        if self._title_depth:
+            if tag == "div":
+                self._title_depth -= 1
+                if not self._title_depth:
+                    self.done = True
+                    return
+            self._parts.append("</" + tag + ">")
+        elif self._company_depth:
+            self._company_depth -= 1
+
+    def handle_data(self, data):
+        if self._title_depth and not self.done:
+            self._parts.append(html.escape(data, quote=False))
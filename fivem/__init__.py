@@ -1,43 +1,157 @@
-import requests
+import codecs
+from typing import Callable, Optional
+
+import aiohttp
 from pyquery import PyQuery
 
 import useragent
+from .ArrayCounter import ArrayCounter
+from .Cache import UpstreamCache
+from .Fleet import Fleet
+from .GetInfo import InfoResponse, request_info
+from .Http import create_session
+from .History import History, HistoryStats
+from .Players import Player, PlayerIndex
+from .Rollup import MinuteRollup
+from .Scheduler import PollScheduler, ServerPollScheduler
 from .Server import Server
 from .State import State
+from .StatusExtractor import StatusExtractor
+
+
+DOWN_DETECTOR_URL = "https://allestörungen.de/stoerung/fivem/"
+CFX_STATUS_URL = "https://status.cfx.re/api/v2/status.json"
+CFX_COMPONENTS_URL = "https://status.cfx.re/api/v2/components.json"
+CFX_INCIDENTS_URL = "https://status.cfx.re/api/v2/incidents/unresolved.json"
 
 
-def down_detector() -> str:
+def _truncate(text: str, length: int = 500) -> str:
+    return (text[:length] + '..') if len(text) > length else text
+
+
+async def down_detector(session: aiohttp.ClientSession, cache: UpstreamCache = None, timeout: float = 6,
+                        stream: bool = True) -> str:
     """Check the FiveM Server status from `AlleStörungen.de`.
     It requests the website and will parse the html code to identify the status message.
 
+    :param session: The session to send the request with
+    :type session: aiohttp.ClientSession
+    :param cache: When given, the request is conditional and the result is stored in the cache
+    :type cache: UpstreamCache
+    :param timeout: The seconds until the request is aborted
+    :type timeout: float
+    :param stream: Whether to parse the page while it is downloaded and stop when the status was found.
+        Otherwise the whole page is downloaded and parsed with PyQuery
+    :type stream: bool
     :return: The status message from the website. Truncated to 500 characters
     :rtype: str
 
     :raises Exception: When the request or parsing the data fails.
     """
-    url = 'https://allestörungen.de/stoerung/fivem/'
     headers = {'User-Agent': useragent.rand()}
-    response = requests.get(url, headers=headers, timeout=6)
-    pq = PyQuery(response.text)
-    tag = pq("body div#company div.h2.entry-title")
-    status = tag.html()
+    if cache is not None:
+        headers.update(cache.conditional_headers("down_detector"))
+    # leaving the block without reading the rest of the page closes the connection
+    async with session.get(DOWN_DETECTOR_URL, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+        if r.status == 304 and cache is not None:
+            return cache.revalidated("down_detector")
+        if stream:
+            # get_encoding() raises without a charset, because the body was not read yet
+            encoding = r.charset or "utf-8"
+            try:
+                codecs.lookup(encoding)
+            except LookupError:
+                encoding = "utf-8"
+            extractor = StatusExtractor(encoding)
+            async for chunk in r.content.iter_chunked(8192):
+                if extractor.feed_bytes(chunk):
+                    break
+            status = extractor.status
+        else:
+            pq = PyQuery(await r.text())
+            tag = pq("body div#company div.h2.entry-title")
+            status = tag.html()
     if not status:
         raise Exception("parsing the status failed")
-    status = status.strip()
-    tc = (status[:500] + '..') if len(status) > 500 else status
+    tc = _truncate(status.strip())
+    if cache is not None:
+        cache.store("down_detector", tc, r.headers)
     return tc
 
 
-def cfx_status() -> str:
+async def _request_cfx(session: aiohttp.ClientSession, url: str, key: str, cache: Optional[UpstreamCache],
+                       timeout: float, parse: Callable[[dict], str]) -> str:
+    """Request an endpoint of the cfx.re status api and parse the json with the function"""
+    headers = cache.conditional_headers(key) if cache is not None else {}
+    async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+        if r.status == 304 and cache is not None:
+            return cache.revalidated(key)
+        r.raise_for_status()
+        value = parse(await r.json(content_type=None))
+    if cache is not None:
+        cache.store(key, value, r.headers)
+    return value
+
+
+async def cfx_status(session: aiohttp.ClientSession, cache: UpstreamCache = None, timeout: float = 5) -> str:
     """Request the FiveM server status from the official cfx.re status api
     https://status.cfx.re/api/v2/status.json
 
+    :param session: The session to send the request with
+    :type session: aiohttp.ClientSession
+    :param cache: When given, the request is conditional and the result is stored in the cache
+    :type cache: UpstreamCache
+    :param timeout: The seconds until the request is aborted
+    :type timeout: float
     :return: The official cfx.re status message of fivem. Truncated to 500 characters
     :rtype: str
 
     :raises Exception: When the request or parsing the data fails.
     """
-    r = requests.get("https://status.cfx.re/api/v2/status.json", timeout=5)
-    status = str(r.json()["status"]["description"])
-    tc = (status[:500] + '..') if len(status) > 500 else status
-    return tc
+    return await _request_cfx(session, CFX_STATUS_URL, "cfx_status", cache, timeout,
+                              lambda data: _truncate(str(data["status"]["description"])))
+
+
+async def cfx_components(session: aiohttp.ClientSession, cache: UpstreamCache = None, timeout: float = 5) -> str:
+    """Request the components of fivem which are not operational from the cfx.re status api
+    https://status.cfx.re/api/v2/components.json
+
+    :param session: The session to send the request with
+    :type session: aiohttp.ClientSession
+    :param cache: When given, the request is conditional and the result is stored in the cache
+    :type cache: UpstreamCache
+    :param timeout: The seconds until the request is aborted
+    :type timeout: float
+    :return: One line ``name: status`` per affected component, e.g. ``CnL: partial outage``.
+        Empty when all components are operational. Truncated to 200 characters
+    :rtype: str
+
+    :raises Exception: When the request or parsing the data fails.
+    """
+    def parse(data: dict) -> str:
+        return _truncate("\n".join(
+            str(component["name"]) + ": " + str(component["status"]).replace("_", " ")
+            for component in data["components"]
+            if component["status"] != "operational" and not component.get("group")
+        ), 200)
+
+    return await _request_cfx(session, CFX_COMPONENTS_URL, "cfx_components", cache, timeout, parse)
+
+
+async def cfx_incidents(session: aiohttp.ClientSession, cache: UpstreamCache = None, timeout: float = 5) -> str:
+    """Request the unresolved incidents from the cfx.re status api
+    https://status.cfx.re/api/v2/incidents/unresolved.json
+
+    :param session: The session to send the request with
+    :type session: aiohttp.ClientSession
+    :param cache: When given, the request is conditional and the result is stored in the cache
+    :type cache: UpstreamCache
+    :param timeout: The seconds until the request is aborted
+    :type timeout: float
+    :return: One line per incident with its name. Empty when there is no incident. Truncated to 200 characters
+    :rtype: str
+
+    :raises Exception: When the request or parsing the data fails.
+    """
+    return await _request_cfx(session, CFX_INCIDENTS_URL, "cfx_incidents", cache, timeout,
+                              lambda data: _truncate("\n".join(str(i["name"]) for i in data["incidents"]), 200))
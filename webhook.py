@@ -0,0 +1,143 @@
+"""Publishes the status messages through discord webhooks, without connecting to the discord gateway.
+Start it with ``python3 webhook.py`` instead of ``python3 bot.py``.
+The commands, the restart detection and the player log need the gateway and are not available."""
+import asyncio
+import logging
+from typing import List
+
+import aiohttp
+import discord
+
+import bot
+import dashboard
+import fivem
+
+
+class WebhookTarget:
+    """A webhook through which the status message of a server is displayed"""
+
+    def __init__(self, webhook: discord.Webhook, key: str):
+        self.webhook: discord.Webhook = webhook
+        """The webhook which sends and edits the status message"""
+        self.key: str = key
+        """Identifies the status message in the saved status messages"""
+        self.message_id: int = None
+        """The ID of the status message. None when it was not sent yet"""
+        self.editor: dashboard.StatusEditor = None
+        """Sends the edits of the status message. Every target is rate limited on its own"""
+
+
+def load_webhook_urls(monitored: bot.MonitoredServer) -> List[str]:
+    """Gets the webhook URLs of the server from its config section"""
+    section = "Server:" + monitored.server.name
+    if not bot.config.has_section(section):
+        section = "Settings"
+    text = bot.config.get(section, "webhook-urls", fallback="")
+    return [url for url in text.replace(",", " ").split() if url]
+
+
+class WebhookDashboard(bot.StatusDashboard):
+    """Requests the servers and edits their status messages through webhooks"""
+
+    session: aiohttp.ClientSession = None
+    """The HTTP session shared by all webhooks"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    async def start(self):
+        """Creates the webhooks of all servers and starts the loops of the dashboard"""
+        self.session = fivem.create_session(limit=10)
+        adapter = discord.AsyncWebhookAdapter(self.session)
+        handles = dashboard.read_json(bot.STATUS_MESSAGES_FILE, {})
+        for monitored in bot.MONITORED_SERVERS:
+            monitored.targets = []
+            for url in load_webhook_urls(monitored):
+                try:
+                    webhook = discord.Webhook.from_url(url, adapter=adapter)
+                except discord.InvalidArgument:
+                    logging.error("invalid webhook url for " + monitored.server.name + ": " + url)
+                    continue
+                target = WebhookTarget(webhook, monitored.server.name + "@webhook:" + str(webhook.id))
+                handle = handles.get(target.key)
+                if handle and handle.get("webhook_id") == webhook.id:
+                    target.message_id = handle["message_id"]
+                monitored.targets.append(target)
+            if not monitored.targets:
+                logging.warning("no webhook-urls configured for " + monitored.server.name)
+        self.start_dashboard()
+        logging.info("Publishing the status messages through webhooks")
+
+    async def close(self):
+        await self.stop_dashboard()
+        if self.session is not None:
+            await self.session.close()
+
+    async def edit_status_message(self, monitored: bot.MonitoredServer, target: WebhookTarget, embed) -> bool:
+        """Edits the status message of the server through the webhook of the target.
+        Use the :class:`dashboard.StatusEditor` of the target instead of calling this directly.
+
+        :return: Whether the status message shows the embed afterwards
+        :rtype: bool
+
+        :raises discord.HTTPException: When discord rate limited the request
+        """
+        with bot.Metrics.EDIT_STATUS_MESSAGE.time(server=monitored.server.name, channel=target.key):
+            # noinspection PyBroadException
+            try:
+                if target.message_id is None:
+                    return await self.send_status_message(target, embed)
+                await target.webhook.edit_message(target.message_id, embed=embed, content=None)
+                return True
+            except discord.NotFound:
+                # the status message was deleted
+                target.message_id = None
+                return await self.send_status_message(target, embed)
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    raise
+                logging.warning("skipped status update " + target.key + ": " + str(e))
+            except Exception as e:
+                logging.warning("skipped status update " + target.key, exc_info=e)
+            bot.Metrics.SKIPPED_UPDATES.inc(server=monitored.server.name)
+            return False
+
+    @staticmethod
+    async def send_status_message(target: WebhookTarget, embed) -> bool:
+        """Sends a new status message through the webhook and saves its ID, so it is edited again after a restart
+
+        :return: Whether the status message was sent
+        :rtype: bool
+        """
+        # the last sent embed is gone with the old message. Until a new one shows the embed, nothing is skipped
+        target.editor.invalidate()
+        try:
+            message = await target.webhook.send(embed=embed, wait=True)
+        except discord.NotFound:
+            logging.error("the webhook of " + target.key + " was deleted")
+            return False
+        target.message_id = message.id
+        handles = dashboard.read_json(bot.STATUS_MESSAGES_FILE, {})
+        handles[target.key] = {
+            "webhook_id": target.webhook.id,
+            "message_id": message.id,
+        }
+        try:
+            dashboard.write_json_atomic(bot.STATUS_MESSAGES_FILE, handles)
+        except OSError as e:
+            logging.error("failed to save the status message", exc_info=e)
+        logging.info("sent status message " + target.key)
+        return True
+
+
+if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    publisher = WebhookDashboard(loop)
+    try:
+        loop.run_until_complete(publisher.start())
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(publisher.close())
+        loop.close()
@@ -0,0 +1,144 @@
+"""The probe worker. Requests the FiveM servers and the fivem status in its own process,
+so slow requests and parsing never delay the discord client. The bot only renders and publishes the results.
+It is started and restarted by the bot when ``probe-worker=yes`` is set in the config.
+
+The messages are JSON objects, one per line. The worker writes to stdout:
+
+- ``{"type": "servers", "servers": [{"server": name, "snapshot": {...}, "latency": ms,
+  "latency_full": bool, "request_duration": s}]}``
+- ``{"type": "players", "server": name, "joined": [{...}], "left": [{...}]}``
+- ``{"type": "players", "server": name, "seed": [{...}]}`` once the worker knows who is on the server
+- ``{"type": "upstream", "key": key of bot.UPSTREAM_SOURCES, "value": status}`` after every fetch of the source
+  and when the status changed
+
+and reads from stdin:
+
+- ``{"type": "restart", "server": name, "next_restart": timestamp, "now": bool}``
+- ``{"type": "players", "server": name, "players": amount}``
+"""
+import asyncio
+import functools
+import json
+import logging
+import sys
+from typing import List
+
+import bot
+
+
+class ProbeWorker(bot.StatusDashboard):
+    """Requests the servers like the bot, but sends the states to the bot instead of publishing them"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.seeds_sent: set = set()
+        """The names of the servers whose tracked players were sent to the bot as seed"""
+
+    async def run(self):
+        """Requests the servers until the bot closes the stdin of the worker"""
+        self.poll_wakeup = asyncio.Event()
+        for monitored in bot.MONITORED_SERVERS:
+            if monitored.server.player_index is not None:
+                monitored.server.player_index.subscribe(functools.partial(self.send_players, monitored))
+        tasks = [
+            self.loop.create_task(self.update_status_loop()),
+            self.loop.create_task(self.update_fivem_status_loop()),
+        ]
+        try:
+            await self.read_messages()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await bot.fleet.close()
+            if self.upstream_session is not None:
+                await self.upstream_session.close()
+
+    @staticmethod
+    def send(message: dict):
+        """Sends a message to the bot"""
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    async def read_messages(self):
+        """Applies the messages of the bot"""
+        reader = asyncio.StreamReader(limit=2 ** 20)
+        await self.loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        async for line in reader:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logging.warning("invalid message from the bot")
+                continue
+            if message.get("type") == "restart":
+                self.apply_restart(message)
+            elif message.get("type") == "players":
+                self.apply_players(message)
+
+    def apply_restart(self, message: dict):
+        """Applies a restart which the bot detected"""
+        monitored = bot.MONITORED_SERVERS_BY_NAME.get(message.get("server"))
+        if monitored is None:
+            return
+        if message.get("now"):
+            monitored.server.set_state_restarting()
+            monitored.scheduler.reschedule_server()
+            self.poll_wakeup.set()
+        monitored.server.next_restart = int(message["next_restart"])
+
+    def apply_players(self, message: dict):
+        """Applies the player amount which a server pushed to the ingest endpoint of the bot"""
+        monitored = bot.MONITORED_SERVERS_BY_NAME.get(message.get("server"))
+        if monitored is None:
+            return
+        monitored.server.players = int(message["players"])
+        if not monitored.server.is_online():
+            monitored.scheduler.wake()
+            self.poll_wakeup.set()
+
+    async def edit_status_message(self, monitored: bot.MonitoredServer, target, embed) -> bool:
+        """The worker has no status messages, the bot publishes the states it sends"""
+        return False
+
+    def servers_updated(self, updated: List[bot.MonitoredServer]):
+        self.send({"type": "servers", "servers": [{
+            "server": monitored.server.name,
+            "snapshot": monitored.server.snapshot(),
+            "latency": monitored.server.latency,
+            "latency_full": monitored.server.latency_full,
+            "request_duration": monitored.server.request_duration,
+        } for monitored in updated]})
+        for monitored in updated:
+            index = monitored.server.player_index
+            if index is not None and index.seeded and monitored.server.name not in self.seeds_sent:
+                self.seeds_sent.add(monitored.server.name)
+                self.send({
+                    "type": "players",
+                    "server": monitored.server.name,
+                    "seed": [player.to_dict() for player in index.players.values()],
+                })
+
+    def send_players(self, monitored: bot.MonitoredServer, joined: list, left: list):
+        """Sends the players who joined or left the server"""
+        self.send({
+            "type": "players",
+            "server": monitored.server.name,
+            "joined": [player.to_dict() for player in joined],
+            "left": [player.to_dict() for player in left],
+        })
+
+    def upstream_updated(self, key: str):
+        self.send({"type": "upstream", "key": key, "value": bot.upstream_cache.get(key)})
+
+    def upstream_revalidated(self, key: str):
+        self.upstream_updated(key)
+
+
+if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    logging.info("Starting the probe worker")
+    try:
+        loop.run_until_complete(ProbeWorker(loop).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()